@@ -1,16 +1,20 @@
 import sys
-import threading
+import contextvars
+
+_buffer = contextvars.ContextVar("stdout_buffer", default=None)
 
 class ThreadLocalStdout:
     """
-    A thread-local proxy for sys.stdout.
+    A thread-local (and asyncio task-local) proxy for sys.stdout.
 
     This class wraps the real stdout and redirects write and flush calls
-    to a thread-local buffer if set. Otherwise, it writes to the original stdout.
+    to a buffer of the current context if set. Otherwise, it writes to the original stdout.
 
-    Each thread can set its own buffer (e.g. io.StringIO) to capture output
-    separately, allowing concurrent threads to redirect their print output
-    without interfering with each other.
+    Each thread or asyncio task can set its own buffer (e.g. io.StringIO) to capture output
+    separately, allowing concurrent threads and tasks to redirect their print output
+    without interfering with each other. The buffer is kept in a context variable,
+    so it is inherited by tasks created and `asyncio.to_thread` calls made from the
+    context that set it.
 
     Usage:
         1. Replace sys.stdout with an instance of this class.
@@ -28,7 +32,6 @@ class ThreadLocalStdout:
             real_stdout: The original sys.stdout to fall back to.
         """
         self.real_stdout = real_stdout
-        self.local = threading.local()
 
     def activate(self):
         sys.stdout = self
@@ -36,18 +39,18 @@ class ThreadLocalStdout:
 
     def set_thread_buffer(self, buffer):
         """
-        Assign a buffer to capture output for the current thread.
+        Assign a buffer to capture output for the current thread or task.
 
         Args:
             buffer: A file-like object (e.g., io.StringIO) to redirect output into.
         """
-        self.local.buffer = buffer
+        _buffer.set(buffer)
 
     def clear_thread_buffer(self):
         """
-        Clear the thread-local buffer, restoring output to the original stdout.
+        Clear the buffer of the current thread or task, restoring output to the original stdout.
         """
-        self.local.buffer = None
+        _buffer.set(None)
 
     def write(self, data):
         """
@@ -56,8 +59,9 @@ class ThreadLocalStdout:
         Args:
             data (str): Text to write.
         """
-        if hasattr(self.local, "buffer") and self.local.buffer is not None:
-            self.local.buffer.write(data)
+        buffer = _buffer.get()
+        if buffer is not None:
+            buffer.write(data)
         else:
             self.real_stdout.write(data)
 
@@ -65,7 +69,8 @@ class ThreadLocalStdout:
         """
         Flush the thread-local buffer if set; otherwise flush the real stdout.
         """
-        if hasattr(self.local, "buffer") and self.local.buffer is not None:
-            self.local.buffer.flush()
+        buffer = _buffer.get()
+        if buffer is not None:
+            buffer.flush()
         else:
             self.real_stdout.flush()
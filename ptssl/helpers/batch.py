@@ -0,0 +1,234 @@
+"""
+Batch helpers – scanning of many targets from a single ptssl process.
+
+Contains:
+- read_targets() for loading a target list from a file or stdin.
+- get_endpoint_fingerprint() and cluster_targets() for finding targets
+  served by the same TLS endpoint.
+- BatchRunner class running a scan function for every target
+  with a bounded number of parallel scans, optionally limited per group
+  of targets sharing one server (IP:port).
+"""
+
+import asyncio
+import hashlib
+import heapq
+import socket
+import ssl
+import sys
+import time
+
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+def read_targets(path: str) -> list:
+    """
+    Reads targets, one per line, from a file or from stdin.
+
+    Blank lines and lines starting with `#` are ignored, duplicates are
+    dropped while the original order is kept.
+
+    Args:
+        path (str): Path to the target list, or "-" for stdin.
+
+    Returns:
+        list: Target strings.
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+
+    targets = []
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#") and line not in seen:
+            seen.add(line)
+            targets.append(line)
+    return targets
+
+
+def get_endpoint_fingerprint(url: str, timeout: float = 10, resolve=None) -> tuple:
+    """
+    Identifies the TLS endpoint serving the URL with one handshake.
+
+    Args:
+        url (str): Target URL (https://host[:port]).
+        timeout (float): Connection timeout in seconds.
+        resolve (callable, optional): Called as `resolve(host)`, returns the address to
+            connect to or None. Defaults to the system resolver.
+
+    Returns:
+        tuple: (IP, port, SHA256 fingerprint of the certificate, negotiated protocol,
+               negotiated cipher), or None if the handshake fails.
+    """
+    parsed = urlparse(url)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        port = parsed.port or 443
+        if resolve:
+            ip = resolve(parsed.hostname)
+            if ip is None:
+                return None
+        else:
+            ip = socket.getaddrinfo(parsed.hostname, port, type=socket.SOCK_STREAM)[0][4][0]
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=parsed.hostname) as tls:
+                certificate = tls.getpeercert(binary_form=True)
+                return ip, port, hashlib.sha256(certificate).hexdigest(), tls.version(), tls.cipher()[0]
+    except (OSError, ValueError, UnicodeError):
+        return None
+
+
+def cluster_targets(targets: list, fingerprint_of, parallel: int) -> list:
+    """
+    Groups targets sharing one endpoint fingerprint.
+
+    Args:
+        targets (list): Targets to cluster.
+        fingerprint_of (callable): Called as `fingerprint_of(target)`, returns a hashable
+            fingerprint, or None if the target could not be fingerprinted.
+        parallel (int): Number of concurrent fingerprinting calls.
+
+    Returns:
+        list: Clusters (lists of targets) in the order of their first target.
+              Targets without a fingerprint form clusters of their own.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        fingerprints = list(executor.map(fingerprint_of, targets))
+
+    clusters = {}
+    for target, fingerprint in zip(targets, fingerprints):
+        key = fingerprint if fingerprint is not None else ("unknown", target)
+        clusters.setdefault(key, []).append(target)
+    return list(clusters.values())
+
+
+class BatchRunner:
+    """
+    Runs the coroutine `scan_target` for every target, at most `parallel` at once.
+
+    All scans are tasks of one event loop, so thousands of targets in flight
+    cost no threads; cancelling the run (Ctrl+C) cancels every running scan.
+
+    Targets can be grouped (e.g. by the IP:port they resolve to). At most
+    `per_group` scans of one group run at once and consecutive scans of a group
+    start at least `group_delay` seconds apart; free workers meanwhile take
+    targets of other groups, so every worker slot stays in use.
+
+    Results are handed to `on_result` in the order in which the scans finish.
+    """
+
+    def __init__(self, targets: list, parallel: int, scan_target, on_result,
+                 group_of=None, per_group: int = 0, group_delay: float = 0) -> None:
+        """
+        Args:
+            targets (list): Targets to scan.
+            parallel (int): Maximum number of concurrently running scans.
+            scan_target (coroutine function): Awaited as `scan_target(target)`, returns the scan result.
+            on_result (callable): Called as `on_result(target, result)` for every finished scan.
+            group_of (callable, optional): Called as `group_of(target)` in a worker thread for every
+                target before scanning starts, returns the group key. Defaults to one group per target.
+            per_group (int): Maximum number of concurrent scans of one group (0 = unlimited).
+            group_delay (float): Minimum seconds between the starts of two scans of one group.
+        """
+        self.targets = targets
+        self.parallel = max(1, parallel)
+        self.scan_target = scan_target
+        self.on_result = on_result
+        self.group_of = group_of
+        self.per_group = per_group
+        self.group_delay = group_delay
+        self._running = Counter()
+        self._active = 0  # scans running in all groups
+
+    def run(self) -> None:
+        """Scans all targets and blocks until every scan has finished."""
+        asyncio.run(self.run_async())
+
+    async def run_async(self) -> None:
+        """Scans all targets within the running event loop."""
+        groups = await self._get_groups()
+        condition = asyncio.Condition()
+        # Pending targets per group with their position in the target list
+        self._queues = {}
+        for index, target in enumerate(self.targets):
+            self._queues.setdefault(groups[target], deque()).append((index, target))
+        # Groups that may start a scan, ordered by the position of their next target
+        self._ready = [(queue[0][0], group) for group, queue in self._queues.items()]
+        heapq.heapify(self._ready)
+        # Groups waiting for `group_delay`: (time they may start, position of next target, group)
+        self._delayed = []
+        last_start = {}
+        tasks = []
+        try:
+            async with condition:
+                while self._queues:
+                    now = time.monotonic()
+                    while self._delayed and self._delayed[0][0] <= now:
+                        _, index, group = heapq.heappop(self._delayed)
+                        heapq.heappush(self._ready, (index, group))
+                    if not self._ready or self._active >= self.parallel:
+                        wait = self._delayed[0][0] - now if self._delayed else None
+                        try:
+                            await asyncio.wait_for(condition.wait(), wait)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+
+                    _, group = heapq.heappop(self._ready)
+                    queue = self._queues[group]
+                    _, target = queue.popleft()
+                    self._running[group] += 1
+                    self._active += 1
+                    last_start[group] = now
+                    if queue:
+                        self._requeue(group, now)
+                    else:
+                        del self._queues[group]
+                    tasks.append(asyncio.create_task(self._scan(target, group, condition, last_start)))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _get_groups(self) -> dict:
+        if not self.group_of:
+            return {target: target for target in self.targets}
+        semaphore = asyncio.Semaphore(self.parallel)
+
+        async def get_group(target):
+            async with semaphore:
+                return await asyncio.to_thread(self.group_of, target)
+
+        return dict(zip(self.targets, await asyncio.gather(*(get_group(target) for target in self.targets))))
+
+    def _requeue(self, group, last_start: float) -> None:
+        """Schedules the next target of the group, unless the group runs `per_group` scans."""
+        if self.per_group and self._running[group] >= self.per_group:
+            return  # requeued by _scan once one of its scans finishes
+        index = self._queues[group][0][0]
+        if self.group_delay:
+            heapq.heappush(self._delayed, (last_start + self.group_delay, index, group))
+        else:
+            heapq.heappush(self._ready, (index, group))
+
+    async def _scan(self, target: str, group, condition: asyncio.Condition, last_start: dict) -> None:
+        try:
+            result = await self.scan_target(target)
+            self.on_result(target, result)
+        finally:
+            async with condition:
+                parked = self.per_group and self._running[group] == self.per_group
+                self._running[group] -= 1
+                self._active -= 1
+                if parked and group in self._queues:
+                    self._requeue(group, last_start[group])
+                condition.notify()
@@ -0,0 +1,284 @@
+"""
+Result cache – testssl findings stored in the penterep temp directory.
+
+Every testssl section is cached as an entry of its own (a full default scan,
+which is not split into sections, as one `FULL_SCAN` entry), so a report can
+be assembled from sections cached by earlier scans of other module mixes and
+each section ages on its own. An entry is keyed by everything that shapes it:
+testssl version, scan profile, command line flags, the address scanned and
+the SNI name, which makes long TTLs safe. Entries are written atomically (temp
+file and rename), so concurrent ptssl processes never read a half written entry.
+
+Entries are stored compressed in a compact layout which keeps values shared
+by all findings (address and port) once instead of in every finding.
+
+The cache directory is kept bounded by `CacheManager`: reading an entry marks
+it as used (access time), the least recently used entries are evicted beyond
+the size and count limits (together with the `--adaptive` quick tier digests
+kept next to them), and files left behind by crashed runs are removed.
+"""
+
+import fcntl
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import time
+import uuid
+
+FULL_SCAN = "full"  # pseudo section of a full default testssl scan
+
+# Entry file suffixes, compressed formats first; `.json` are plain entries of earlier versions.
+ENTRY_SUFFIXES = (".json.xz", ".json.gz", ".json")
+COMPACT_LAYOUT = 2  # version of the compact entry layout, entries of other layouts are discarded
+# Files evicted by `CacheManager`: cache entries and the `--adaptive` quick tier digests
+ENTRY_NAME = re.compile(r"^[0-9a-f]{32}\.(json(\.gz|\.xz)?|adaptive\.json)$")
+
+
+class ResultCache:
+    LZMA_THRESHOLD = 64 << 10  # compact entries larger than this are compressed with lzma (bytes)
+
+    def __init__(self, directory: str) -> None:
+        """
+        Args:
+            directory (str): Cache directory shared by all ptssl processes.
+        """
+        self.directory = directory
+
+    @staticmethod
+    def make_key(testssl_version: str, profile: str, flags: list, url: str, ip: str) -> str:
+        """
+        Returns the cache key of a section.
+
+        Args:
+            testssl_version (str): Output of `testssl --version`.
+            profile (str): Scan profile.
+            flags (list): testssl flags producing the section (section and profile flags).
+            url (str): Target URL; its host name is sent as SNI.
+            ip (str): Address testssl connects to, None if resolved by testssl.
+        """
+        material = json.dumps([testssl_version, profile, list(flags), url, ip])
+        return hashlib.md5(material.encode("utf-8")).hexdigest()
+
+    def load(self, key: str, max_age: float) -> list:
+        """
+        Returns the cached findings, or None if missing or older than `max_age` seconds.
+
+        Reads compressed entries as well as plain JSON entries of earlier versions.
+        Expired and unreadable entries are removed.
+        """
+        for suffix in ENTRY_SUFFIXES:
+            path = self._get_path(key, suffix)
+            if not os.path.exists(path):
+                continue
+            try:
+                modified = os.path.getmtime(path)
+                if (time.time() - modified) > max_age:
+                    raise ValueError("Cache expired")
+                with open(path, "rb") as f:
+                    data = f.read()
+                if suffix == ".json.xz":
+                    data = lzma.decompress(data)
+                elif suffix == ".json.gz":
+                    data = gzip.decompress(data)
+                result = _unpack(json.loads(data))
+                # Access time orders the entries for eviction, modification time stays the entry age
+                os.utime(path, (time.time(), modified))
+                return result
+            except Exception:
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
+                return None
+        return None
+
+    def store(self, key: str, result: list) -> None:
+        """
+        Atomically replaces the entry with new findings.
+
+        The compact layout is compressed with gzip, or with lzma (slower, but
+        smaller) once it exceeds `LZMA_THRESHOLD`.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        payload = json.dumps(_pack(result), separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.LZMA_THRESHOLD:
+            suffix, data = ".json.xz", lzma.compress(payload)
+        else:
+            suffix, data = ".json.gz", gzip.compress(payload, mtime=0)
+
+        temp_path = os.path.join(self.directory, f"{key}_{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, self._get_path(key, suffix))
+        for other_suffix in ENTRY_SUFFIXES:
+            if other_suffix != suffix:
+                try:
+                    os.remove(self._get_path(key, other_suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _get_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+
+class CacheManager:
+    GC_INTERVAL = 10 * 60       # seconds between rate-limited collections of all processes
+    STALE_AGE = 24 * 60 * 60    # seconds after which unused temp, lock and wait files are removed
+
+    def __init__(self, directory: str, max_bytes: int, max_entries: int) -> None:
+        """
+        Args:
+            directory (str): Cache directory shared by all ptssl processes.
+            max_bytes (int): Maximum total size of the cache entries, 0 for no limit.
+            max_entries (int): Maximum number of cache entries, 0 for no limit.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def maybe_collect(self) -> dict:
+        """
+        Runs `collect` unless a process did so within `GC_INTERVAL` or is doing it now.
+
+        Returns:
+            dict: Statistics of `collect`, or None if the collection was skipped.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "cache_gc.stamp"), "a+") as stamp_file:
+            try:
+                fcntl.flock(stamp_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            stamp_file.seek(0)
+            try:
+                last_collected = float(stamp_file.read())
+            except ValueError:
+                last_collected = 0
+            if time.time() - last_collected < self.GC_INTERVAL:
+                return None
+            stamp_file.seek(0)
+            stamp_file.truncate()
+            stamp_file.write(str(time.time()))
+            stamp_file.flush()
+            return self.collect()
+
+    def collect(self) -> dict:
+        """
+        Evicts least recently used entries beyond the limits and removes stale files.
+
+        Temp files (`.tmp`) are removed once older than `STALE_AGE`. Lock and
+        slot wait files (`.lock`, `.wait.`, `.enqueue.`) are removed once older
+        than `STALE_AGE` and not locked by a living process.
+
+        Returns:
+            dict: Number of evicted entries (`evicted`), their bytes (`freed`) and
+                  removed stale files (`stale`), plus the remaining `entries` and `bytes`.
+        """
+        stats = {"evicted": 0, "freed": 0, "stale": 0}
+        now = time.time()
+        entries = []
+        try:
+            listing = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            listing = []
+        for entry in listing:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if ENTRY_NAME.match(entry.name):
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+            elif now - stat.st_mtime < self.STALE_AGE:
+                continue
+            elif entry.name.endswith(".tmp"):
+                stats["stale"] += _remove(entry.path)
+            elif entry.name.endswith(".lock") or ".wait." in entry.name or ".enqueue." in entry.name:
+                stats["stale"] += _remove_if_unlocked(entry.path)
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if (not self.max_bytes or total <= self.max_bytes) and (not self.max_entries or count <= self.max_entries):
+                break
+            if _remove(path):
+                stats["evicted"] += 1
+                stats["freed"] += size
+            total -= size
+            count -= 1
+        stats["entries"] = count
+        stats["bytes"] = total
+        return stats
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _remove_if_unlocked(path: str) -> bool:
+    """Removes a lock file nobody holds; users recheck the inode after locking."""
+    try:
+        with open(path, "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return _remove(path)
+    except FileNotFoundError:
+        return False
+
+
+def _pack(items: list) -> dict:
+    """
+    Converts findings into the compact entry layout.
+
+    Values equal in all findings (typically `ip` and `port`) are stored once in
+    `shared`, the other fields as one row per finding in `fields` order. A row
+    starts with a bit mask of the fields the finding has (bit i for the i-th
+    row field), so missing fields and null values stay distinguishable.
+    """
+    fields = []
+    for item in items:
+        fields.extend(field for field in item if field not in fields)
+    shared = {}
+    if items:
+        shared = {field: items[0][field] for field in fields
+                  if all(field in item and item[field] == items[0][field] for item in items)}
+    columns = [field for field in fields if field not in shared]
+    rows = []
+    for item in items:
+        present = sum(1 << index for index, field in enumerate(columns) if field in item)
+        rows.append([present, *(item.get(field) for field in columns)])
+    return {
+        "layout": COMPACT_LAYOUT,
+        "fields": fields,
+        "shared": shared,
+        "rows": rows,
+    }
+
+
+def _unpack(data) -> list:
+    """
+    Converts an entry back into findings; plain lists are entries of earlier versions.
+
+    Raises:
+        ValueError: If the entry uses an unknown compact layout.
+    """
+    if isinstance(data, list):
+        return data
+    if data.get("layout") != COMPACT_LAYOUT:
+        raise ValueError("Unknown cache entry layout")
+    shared = data["shared"]
+    columns = [field for field in data["fields"] if field not in shared]
+    items = []
+    for present, *row in data["rows"]:
+        values = {**shared, **{field: value for index, (field, value) in enumerate(zip(columns, row)) if present >> index & 1}}
+        items.append({field: values[field] for field in data["fields"] if field in values})
+    return items
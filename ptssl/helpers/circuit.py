@@ -0,0 +1,128 @@
+"""
+Circuit breaker – negative cache of unreachable hosts and subnets.
+
+A failed scan opens the circuit of its host for an exponentially growing
+backoff (`BASE_BACKOFF` doubled with every further failure, at most
+`MAX_BACKOFF`). Once `SUBNET_THRESHOLD` hosts of one subnet (/24, /64 for
+IPv6) are failing, the whole subnet is opened as well. Targets behind an
+open circuit are skipped without being scanned; after the backoff one
+attempt is let through, a success closes the circuits again.
+
+The state is a JSON file shared by all ptssl processes.
+"""
+
+import fcntl
+import ipaddress
+import json
+import os
+import time
+
+from contextlib import contextmanager
+
+
+class CircuitBreaker:
+    BASE_BACKOFF = 5 * 60        # seconds an opened circuit stays open after the first failure
+    MAX_BACKOFF = 24 * 60 * 60   # upper bound of the backoff
+    SUBNET_THRESHOLD = 3         # failing hosts opening the circuit of their subnet
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): JSON state file shared by all ptssl processes.
+        """
+        self.path = path
+
+    def check(self, host: str, ip: str = None) -> str:
+        """
+        Returns why the target must be skipped, or None if its circuits are closed.
+
+        Args:
+            host (str): Host name of the target.
+            ip (str, optional): Resolved address of the target.
+        """
+        now = time.time()
+        with self._state(exclusive=False) as state:
+            entry = state.get(f"host:{host}")
+            if entry and entry["open_until"] > now:
+                return (f"host {host} failed {entry['failures']} times ({entry['reason']}), "
+                        f"retry after {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['open_until']))}")
+            subnet = _get_subnet(ip)
+            entry = state.get(f"subnet:{subnet}") if subnet else None
+            if entry and entry["open_until"] > now:
+                return (f"subnet {subnet} has {len(entry['hosts'])} failing hosts, "
+                        f"retry after {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['open_until']))}")
+        return None
+
+    def record_failure(self, host: str, ip: str, reason: str) -> None:
+        """Opens (or keeps open with a longer backoff) the circuit of the host and possibly its subnet."""
+        now = time.time()
+        with self._state(exclusive=True) as state:
+            entry = state.setdefault(f"host:{host}", {"failures": 0})
+            entry["failures"] += 1
+            entry["reason"] = reason
+            entry["open_until"] = now + self._backoff(entry["failures"])
+            entry["updated"] = now
+
+            subnet = _get_subnet(ip)
+            if subnet:
+                entry = state.setdefault(f"subnet:{subnet}", {"failures": 0, "hosts": [], "open_until": 0})
+                if host not in entry["hosts"]:
+                    entry["hosts"].append(host)
+                entry["updated"] = now
+                if len(entry["hosts"]) >= self.SUBNET_THRESHOLD and entry["open_until"] <= now:
+                    entry["failures"] += 1
+                    entry["open_until"] = now + self._backoff(entry["failures"])
+
+    def record_success(self, host: str, ip: str = None) -> None:
+        """Closes the circuits of the host and its subnet."""
+        subnet = _get_subnet(ip)
+        with self._state(exclusive=True) as state:
+            state.pop(f"host:{host}", None)
+            if subnet:
+                state.pop(f"subnet:{subnet}", None)
+
+    def purge_expired(self) -> int:
+        """
+        Forgets circuits without failures for `MAX_BACKOFF` after they closed.
+
+        Returns:
+            int: Number of removed host and subnet entries.
+        """
+        now = time.time()
+        with self._state(exclusive=True) as state:
+            expired = [key for key, entry in state.items()
+                       if max(entry.get("open_until", 0), entry.get("updated", 0)) + self.MAX_BACKOFF < now]
+            for key in expired:
+                del state[key]
+        return len(expired)
+
+    def _backoff(self, failures: int) -> float:
+        return min(self.BASE_BACKOFF * 2 ** (failures - 1), self.MAX_BACKOFF)
+
+    @contextmanager
+    def _state(self, exclusive: bool):
+        """Yields the state dict under a file lock; changes are written back when exclusive."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            f.seek(0)
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            yield state
+            if exclusive:
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+
+
+def _get_subnet(ip: str) -> str:
+    if not ip:
+        return None
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
@@ -0,0 +1,88 @@
+"""
+DNS cache – resolves every host name once per TTL for the whole ptssl process.
+
+Addresses come from the system resolver (getaddrinfo), so /etc/hosts and
+nsswitch are honoured. With the optional `dnspython` package, an address
+served by DNS is kept for the lowest TTL of its answer (CNAME chain
+included); other answers are kept for a fixed TTL. Concurrent lookups of one
+name wait for a single resolution. IPv4 addresses are preferred, as they are
+what testssl uses by default.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+
+try:
+    import dns.resolver
+    import dns.exception
+except ImportError:
+    # Optional dependency `dnspython` is missing, fall back to getaddrinfo
+    dns = None
+
+
+class DnsCache:
+    def __init__(self, default_ttl: int = 300) -> None:
+        """
+        Args:
+            default_ttl (int): Seconds to keep answers whose DNS TTL is unknown.
+        """
+        self.default_ttl = default_ttl
+        self._entries = {}  # host -> (address, expiry)
+        self._host_locks = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str) -> str:
+        """
+        Returns an address of the host, resolving it only if the cached answer expired.
+
+        Args:
+            host (str): Host name or IP address.
+
+        Returns:
+            str: IP address, or None if the host cannot be resolved.
+        """
+        try:
+            return str(ipaddress.ip_address(host))
+        except ValueError:
+            pass
+
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            entry = self._entries.get(host)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            address, ttl = self._lookup(host)
+            if address is not None:
+                self._entries[host] = (address, time.monotonic() + ttl)
+            return address
+
+    def _lookup(self, host: str) -> tuple:
+        """Resolves the host. Returns (address, TTL in seconds), address None on failure."""
+        try:
+            addresses = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            return None, 0
+        addresses.sort(key=lambda address: address[0] != socket.AF_INET)
+        address = addresses[0][4][0]
+        return address, self._get_ttl(host, address)
+
+    def _get_ttl(self, host: str, address: str) -> float:
+        """
+        Returns how long the address may be cached.
+
+        The lowest TTL of the DNS answer (CNAME records included) if DNS serves the
+        address, `default_ttl` without `dnspython` or for names resolved otherwise
+        (e.g. from /etc/hosts).
+        """
+        if dns is None:
+            return self.default_ttl
+        try:
+            answer = dns.resolver.resolve(host, "AAAA" if ":" in address else "A")
+        except dns.exception.DNSException:
+            return self.default_ttl
+        if address not in {record.to_text() for record in answer}:
+            return self.default_ttl
+        return min(rrset.ttl for rrset in answer.response.answer)
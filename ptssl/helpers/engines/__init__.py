@@ -0,0 +1,69 @@
+"""
+Native engines – pure Python replacements for individual testssl sections.
+
+Every engine is a coroutine `engine(host, ip, port, semaphore, helpers)` returning
+findings in the same shape as the testssl section it replaces, so the test
+modules consume them unchanged. Engines of one target share a semaphore
+bounding the number of concurrent connections to the host.
+"""
+
+import asyncio
+import socket
+
+from urllib.parse import urlparse
+
+from ._tls import TlsProbeError, NativeEngineError
+from .protocols import probe_protocols
+from .ciphers import probe_cipher_categories
+from .headers import probe_headers
+
+try:
+    from .certificate import probe_certificate
+except ImportError:
+    # Optional dependency `cryptography` is missing, TSD keeps using testssl
+    probe_certificate = None
+
+# testssl section -> native engine producing it
+NATIVE_ENGINES = {
+    "protocols":         probe_protocols,
+    "cipher_categories": probe_cipher_categories,
+    "headers":           probe_headers,
+}
+if probe_certificate is not None:
+    NATIVE_ENGINES["server_defaults"] = probe_certificate
+
+
+async def run_native_engines(url: str, sections, connections: int, helpers: object, ip: str = None) -> list:
+    """
+    Runs the native engines of the given sections concurrently.
+
+    Args:
+        url (str): Target URL (https://host[:port]).
+        sections (iterable): Sections present in `NATIVE_ENGINES`.
+        connections (int): Maximum number of concurrent connections to the host.
+        helpers (Helpers): Shared helpers (HTTP client) passed to the engines.
+        ip (str, optional): Address to connect to. Resolved from the URL if not given.
+
+    Returns:
+        list: Findings of all sections.
+
+    Raises:
+        NativeEngineError: If the target cannot be resolved or connected to, or the local
+            OpenSSL cannot probe a protocol version.
+    """
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 443
+
+    if ip is None:
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NativeEngineError(f"Cannot resolve {host}: {e}")
+        ip = addresses[0][4][0]
+    semaphore = asyncio.Semaphore(max(1, connections))
+    engines = [NATIVE_ENGINES[section](host, ip, port, semaphore, helpers) for section in sections]
+    try:
+        results = await asyncio.gather(*engines)
+    except TlsProbeError as e:
+        raise NativeEngineError(str(e))
+    return [row for rows in results for row in rows]
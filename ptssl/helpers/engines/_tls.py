@@ -0,0 +1,346 @@
+"""
+Low level TLS helpers shared by the native engines.
+
+Builds raw SSLv2/SSLv3/TLS ClientHello messages and reads the server's
+first answer, so that protocol versions and cipher suites the local
+OpenSSL no longer supports can still be probed.
+"""
+
+import _ssl
+import asyncio
+import ipaddress
+import os
+import ssl
+import struct
+
+CONNECT_TIMEOUT = 10  # seconds per connection attempt
+
+RECORD_HANDSHAKE = 0x16
+RECORD_ALERT = 0x15
+HANDSHAKE_SERVER_HELLO = 0x02
+HANDSHAKE_CERTIFICATE = 0x0B
+HANDSHAKE_SERVER_HELLO_DONE = 0x0E
+HANDSHAKE_CERTIFICATE_STATUS = 0x16
+
+SSL3_VERSION = 0x0300
+TLS1_VERSION = 0x0301
+TLS1_1_VERSION = 0x0302
+TLS1_2_VERSION = 0x0303
+
+# Broad list of TLS <= 1.2 cipher suites accepted by practically every server.
+DEFAULT_CIPHER_SUITES = [
+    0xC02F, 0xC030, 0xC02B, 0xC02C, 0xCCA8, 0xCCA9, 0x009E, 0x009F, 0x009C, 0x009D,
+    0xC013, 0xC014, 0xC009, 0xC00A, 0xC027, 0xC028, 0xC023, 0xC024, 0x0033, 0x0039,
+    0x002F, 0x0035, 0x003C, 0x003D, 0x0041, 0x0084, 0xC012, 0x0016, 0x000A, 0xC011,
+    0x0005, 0x0004,
+]
+
+SSL2_CIPHER_SPECS = [0x010080, 0x020080, 0x030080, 0x040080, 0x050080, 0x060040, 0x0700C0]
+
+
+class NativeEngineError(Exception):
+    """Raised when a native engine cannot scan the target."""
+
+
+class TlsProbeError(Exception):
+    """Raised when the target cannot be connected to at all."""
+
+
+def is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def extension(ext_type: int, data: bytes) -> bytes:
+    """Encodes a ClientHello extension."""
+    return struct.pack("!HH", ext_type, len(data)) + data
+
+
+def build_client_hello(version: int, cipher_suites: list, server_name: str = None, extensions: list = None) -> bytes:
+    """
+    Builds a complete ClientHello record for SSLv3 - TLS 1.2.
+
+    Args:
+        version (int): Highest protocol version offered (e.g. `TLS1_2_VERSION`).
+        cipher_suites (list): IANA cipher suite codes.
+        server_name (str, optional): Host name sent in the SNI extension.
+        extensions (list, optional): Additional raw extensions (already encoded).
+
+    Returns:
+        bytes: The record ready to be sent.
+    """
+    body = struct.pack("!H", version) + os.urandom(32) + b"\x00"
+    body += struct.pack("!H", 2 * len(cipher_suites)) + b"".join(struct.pack("!H", suite) for suite in cipher_suites)
+    body += b"\x01\x00"
+
+    if version >= TLS1_VERSION:
+        ext = b""
+        if server_name and not is_ip_address(server_name):
+            name = server_name.encode("idna")
+            ext += extension(0x0000, struct.pack("!HBH", len(name) + 3, 0, len(name)) + name)
+        groups = [0x001D, 0x0017, 0x0018, 0x0019, 0x0100, 0x0101]
+        ext += extension(0x000A, struct.pack("!H", 2 * len(groups)) + b"".join(struct.pack("!H", g) for g in groups))
+        ext += extension(0x000B, b"\x01\x00")
+        if version >= TLS1_2_VERSION:
+            sig_algs = [0x0403, 0x0503, 0x0603, 0x0804, 0x0805, 0x0806, 0x0401, 0x0501, 0x0601, 0x0201, 0x0203]
+            ext += extension(0x000D, struct.pack("!H", 2 * len(sig_algs)) + b"".join(struct.pack("!H", s) for s in sig_algs))
+        ext += extension(0xFF01, b"\x00")
+        for extra in extensions or []:
+            ext += extra
+        body += struct.pack("!H", len(ext)) + ext
+
+    handshake = bytes([0x01]) + len(body).to_bytes(3, "big") + body
+    record_version = min(version, TLS1_VERSION)
+    return bytes([RECORD_HANDSHAKE]) + struct.pack("!HH", record_version, len(handshake)) + handshake
+
+
+def build_sslv2_client_hello() -> bytes:
+    """Builds an SSLv2 CLIENT-HELLO message offering all SSLv2 cipher specs."""
+    specs = b"".join(spec.to_bytes(3, "big") for spec in SSL2_CIPHER_SPECS)
+    challenge = os.urandom(16)
+    body = b"\x01" + struct.pack("!HHHH", 0x0002, len(specs), 0, len(challenge)) + specs + challenge
+    return struct.pack("!H", 0x8000 | len(body)) + body
+
+
+async def open_connection(ip: str, port: int):
+    """
+    Opens a TCP connection within `CONNECT_TIMEOUT`.
+
+    Raises:
+        TlsProbeError: If the connection cannot be established.
+    """
+    try:
+        return await asyncio.wait_for(asyncio.open_connection(ip, port), CONNECT_TIMEOUT)
+    except (OSError, asyncio.TimeoutError) as e:
+        raise TlsProbeError(f"Cannot connect to {ip}:{port}: {e or 'timeout'}")
+
+
+async def close_connection(writer) -> None:
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (OSError, ssl.SSLError):
+        pass
+
+
+async def read_record(reader) -> tuple:
+    """
+    Reads one TLS record.
+
+    Returns:
+        tuple: (content type, record version, payload), or None if the
+               server closed the connection instead.
+    """
+    try:
+        header = await asyncio.wait_for(reader.readexactly(5), CONNECT_TIMEOUT)
+        content_type, version, length = struct.unpack("!BHH", header)
+        payload = await asyncio.wait_for(reader.readexactly(length), CONNECT_TIMEOUT)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return content_type, version, payload
+
+
+def parse_server_hello(payload: bytes) -> tuple:
+    """
+    Extracts the negotiated version and cipher suite from a ServerHello.
+
+    Returns:
+        tuple: (version, cipher suite), or None if the payload is not a ServerHello.
+    """
+    if len(payload) < 39 or payload[0] != HANDSHAKE_SERVER_HELLO:
+        return None
+    version = struct.unpack("!H", payload[4:6])[0]
+    session_id_length = payload[38]
+    offset = 39 + session_id_length
+    if len(payload) < offset + 2:
+        return None
+    return version, struct.unpack("!H", payload[offset:offset + 2])[0]
+
+
+async def send_client_hello(ip: str, port: int, client_hello: bytes) -> tuple:
+    """
+    Sends a ClientHello and waits for the ServerHello.
+
+    Returns:
+        tuple: (version, cipher suite) chosen by the server, or None if the
+               server refused the handshake.
+
+    Raises:
+        TlsProbeError: If the connection cannot be established.
+    """
+    reader, writer = await open_connection(ip, port)
+    try:
+        writer.write(client_hello)
+        await writer.drain()
+        record = await read_record(reader)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        await close_connection(writer)
+
+    if record is None or record[0] != RECORD_HANDSHAKE:
+        return None
+    return parse_server_hello(record[2])
+
+
+def parse_server_hello_extensions(body: bytes) -> dict:
+    """
+    Returns the extensions of a ServerHello message body (without the
+    handshake header) as {extension type: data}.
+    """
+    offset = 35 + body[34] + 3
+    extensions = {}
+    if len(body) < offset + 2:
+        return extensions
+    end = offset + 2 + struct.unpack("!H", body[offset:offset + 2])[0]
+    offset += 2
+    while offset + 4 <= min(end, len(body)):
+        ext_type, length = struct.unpack("!HH", body[offset:offset + 4])
+        extensions[ext_type] = body[offset + 4:offset + 4 + length]
+        offset += 4 + length
+    return extensions
+
+
+def parse_certificate_message(body: bytes) -> list:
+    """
+    Returns the DER encoded certificates of a TLS <= 1.2 Certificate message, leaf first.
+    """
+    certificates = []
+    offset = 3
+    while offset + 3 <= len(body):
+        length = int.from_bytes(body[offset:offset + 3], "big")
+        certificates.append(body[offset + 3:offset + 3 + length])
+        offset += 3 + length
+    return certificates
+
+
+async def read_server_flight(ip: str, port: int, client_hello: bytes) -> list:
+    """
+    Sends a TLS <= 1.2 ClientHello and collects the server's handshake
+    messages up to ServerHelloDone (all of them are unencrypted).
+
+    Returns:
+        list: (message type, message body) pairs, or None if the server
+              refused the handshake.
+
+    Raises:
+        TlsProbeError: If the connection cannot be established.
+    """
+    reader, writer = await open_connection(ip, port)
+    messages = []
+    buffer = b""
+    try:
+        writer.write(client_hello)
+        await writer.drain()
+        while True:
+            record = await read_record(reader)
+            if record is None or record[0] != RECORD_HANDSHAKE:
+                break
+            buffer += record[2]
+            while len(buffer) >= 4 and len(buffer) >= 4 + int.from_bytes(buffer[1:4], "big"):
+                length = int.from_bytes(buffer[1:4], "big")
+                messages.append((buffer[0], buffer[4:4 + length]))
+                buffer = buffer[4 + length:]
+            if messages and messages[-1][0] == HANDSHAKE_SERVER_HELLO_DONE:
+                break
+    except (OSError, asyncio.TimeoutError):
+        pass
+    finally:
+        await close_connection(writer)
+
+    if not messages or messages[0][0] != HANDSHAKE_SERVER_HELLO:
+        return None
+    return messages
+
+
+async def send_sslv2_client_hello(ip: str, port: int) -> bool:
+    """
+    Returns True if the server answers an SSLv2 CLIENT-HELLO with a SERVER-HELLO offering ciphers.
+
+    Raises:
+        TlsProbeError: If the connection cannot be established.
+    """
+    reader, writer = await open_connection(ip, port)
+    try:
+        writer.write(build_sslv2_client_hello())
+        await writer.drain()
+        header = await asyncio.wait_for(reader.readexactly(11), CONNECT_TIMEOUT)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return False
+    finally:
+        await close_connection(writer)
+
+    # 2 byte record header, then SERVER-HELLO: type, session id hit, certificate type,
+    # version, certificate length, cipher specs length
+    if not header[0] & 0x80 or header[2] != 0x04:
+        return False
+    cipher_specs_length = struct.unpack("!H", header[9:11])[0]
+    return cipher_specs_length > 0
+
+
+def create_probe_context(version: ssl.TLSVersion) -> ssl.SSLContext:
+    """
+    Creates a non-verifying client context limited to one protocol version.
+
+    Raises:
+        NativeEngineError: If the local OpenSSL does not support the version or cipher
+            string, so the section has to be scanned by testssl.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        context.minimum_version = version
+        context.maximum_version = version
+        if version < ssl.TLSVersion.TLSv1_3:
+            context.set_ciphers("ALL:@SECLEVEL=0")
+    except (ssl.SSLError, ValueError) as e:
+        raise NativeEngineError(f"Local OpenSSL cannot probe {version.name}: {e}")
+    return context
+
+
+async def tls_handshake(ip: str, port: int, context: ssl.SSLContext, server_name: str = None) -> dict:
+    """
+    Performs a full handshake through the ssl module.
+
+    Returns:
+        dict: {"version", "cipher", "certificate" (DER)} of the established
+              connection, or None if the handshake failed.
+
+    Raises:
+        TlsProbeError: If the TCP connection cannot be established.
+    """
+    reader, writer = await open_connection(ip, port)
+    try:
+        await asyncio.wait_for(
+            writer.start_tls(context, server_hostname=server_name or ip, ssl_handshake_timeout=CONNECT_TIMEOUT),
+            CONNECT_TIMEOUT + 1
+        )
+        ssl_object = writer.get_extra_info("ssl_object")
+        return {
+            "version": ssl_object.version(),
+            "cipher": ssl_object.cipher(),
+            "certificate": ssl_object.getpeercert(binary_form=True),
+            "chain": _get_unverified_chain(ssl_object),
+        }
+    except (OSError, ssl.SSLError, asyncio.TimeoutError):
+        return None
+    finally:
+        await close_connection(writer)
+
+
+def _get_unverified_chain(ssl_object) -> list:
+    """
+    Returns the DER encoded certificates sent by the server, leaf first.
+
+    The accessor is public since Python 3.13 and available on the private
+    `_sslobj` before; an empty list is returned where neither exists.
+    """
+    get_chain = getattr(ssl_object, "get_unverified_chain", None) \
+        or getattr(getattr(ssl_object, "_sslobj", None), "get_unverified_chain", None)
+    if get_chain is None:
+        return []
+    return [certificate.public_bytes(_ssl.ENCODING_DER) for certificate in get_chain() or []]
@@ -0,0 +1,296 @@
+"""
+Native certificate engine – replaces the testssl `server_defaults` section for TSD.
+
+Collects the certificate chain, OCSP stapling and certificate transparency
+from a single TLS 1.2 handshake (whose certificate messages are not
+encrypted), falling back to a TLS 1.3 handshake through the ssl module for
+TLS 1.3 only servers. The chain is validated locally against the system
+trust store; validation results of intermediate CAs are memoized by their
+fingerprint together with the certificates they were sent with, so batch
+scans of hosts serving the same chain validate it only once.
+
+Requires the optional `cryptography` package for X.509 parsing.
+"""
+
+import asyncio
+import glob
+import hashlib
+import os
+import ssl
+import threading
+
+from datetime import datetime, timezone
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, dsa
+
+from ._tls import (
+    TLS1_2_VERSION, DEFAULT_CIPHER_SUITES, HANDSHAKE_CERTIFICATE, HANDSHAKE_CERTIFICATE_STATUS,
+    build_client_hello, extension, read_server_flight, parse_server_hello_extensions,
+    parse_certificate_message, create_probe_context, tls_handshake, is_ip_address
+)
+
+EXT_STATUS_REQUEST = 0x0005
+EXT_SIGNED_CERTIFICATE_TIMESTAMP = 0x0012
+SCT_OID = x509.ObjectIdentifier("1.3.6.1.4.1.11129.2.4.2")
+MAX_CHAIN_DEPTH = 8
+
+# Row ids of the testssl `server_defaults` section starting at cert_signatureAlgorithm.
+# TSD reads the rows by their offset, so the native rows keep the same positions.
+SECTION_LAYOUT = (
+    "cert_signatureAlgorithm", "cert_keySize", "cert_keyUsage", "cert_extKeyUsage", "cert_serialNumber",
+    "cert_serialNumberLen", "cert_fingerprintSHA1", "cert_fingerprintSHA256", "cert", "cert_commonName",
+    "cert_commonName_wo_SNI", "cert_subjectAltName", "cert_trust", "cert_chain_of_trust", "cert_certificatePolicies_EV",
+    "cert_expirationStatus", "cert_notBefore", "cert_notAfter", "cert_extlifeSpan", "certs_countServer",
+    "certs_list_ordering_problem", "cert_crlDistributionPoints", "OCSP_stapling", "cert_mustStapleExtension",
+    "DNS_CAArecord", "certificate_transparency",
+)
+
+_trust_store = None
+_trust_store_lock = threading.Lock()
+_validation_cache = {}  # (intermediate, depth, sent intermediates) SHA256 fingerprints -> (valid, reason)
+_validation_cache_lock = threading.Lock()
+
+
+def _load_trust_store() -> dict:
+    """Loads the system trust store once, indexed by DER encoded subject."""
+    global _trust_store
+    with _trust_store_lock:
+        if _trust_store is None:
+            paths = ssl.get_default_verify_paths()
+            files = [path for path in (paths.cafile, paths.openssl_cafile) if path and os.path.isfile(path)]
+            for directory in (paths.capath, paths.openssl_capath):
+                if directory and os.path.isdir(directory):
+                    files.extend(glob.glob(os.path.join(directory, "*")))
+            store = {}
+            for path in set(files):
+                try:
+                    with open(path, "rb") as f:
+                        certificates = x509.load_pem_x509_certificates(f.read())
+                except (OSError, ValueError):
+                    continue
+                for certificate in certificates:
+                    store.setdefault(certificate.subject.public_bytes(), []).append(certificate)
+            _trust_store = store
+    return _trust_store
+
+
+def _not_valid_after(certificate) -> datetime:
+    return getattr(certificate, "not_valid_after_utc", None) or certificate.not_valid_after.replace(tzinfo=timezone.utc)
+
+
+def _not_valid_before(certificate) -> datetime:
+    return getattr(certificate, "not_valid_before_utc", None) or certificate.not_valid_before.replace(tzinfo=timezone.utc)
+
+
+def _is_issued_by(certificate, issuer) -> bool:
+    try:
+        certificate.verify_directly_issued_by(issuer)
+        return True
+    except Exception:
+        return False
+
+
+def _validate(certificate, intermediates: list, depth: int = 0) -> tuple:
+    """
+    Validates a certificate up to a trust anchor of the system store.
+
+    Returns:
+        tuple: (valid, reason of failure)
+    """
+    if _not_valid_after(certificate) < datetime.now(timezone.utc):
+        return False, "certificate expired"
+    for anchor in _load_trust_store().get(certificate.issuer.public_bytes(), []):
+        if _is_issued_by(certificate, anchor):
+            return True, ""
+    if depth >= MAX_CHAIN_DEPTH:
+        return False, "chain too long"
+    for candidate in intermediates:
+        if candidate is not certificate and candidate.subject == certificate.issuer and _is_issued_by(certificate, candidate):
+            return _validate_intermediate(candidate, intermediates, depth + 1)
+    if certificate.issuer == certificate.subject:
+        return False, "self signed"
+    return False, "unable to get local issuer certificate"
+
+
+def _validate_intermediate(certificate, intermediates: list, depth: int) -> tuple:
+    # The verdict depends on the issuers available in the chain, not only on the certificate
+    key = (certificate.fingerprint(hashes.SHA256()), depth,
+           tuple(sorted(candidate.fingerprint(hashes.SHA256()) for candidate in intermediates)))
+    with _validation_cache_lock:
+        if key in _validation_cache:
+            return _validation_cache[key]
+    result = _validate(certificate, intermediates, depth)
+    with _validation_cache_lock:
+        _validation_cache[key] = result
+    return result
+
+
+def _get_names(certificate) -> list:
+    try:
+        san = certificate.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        names = san.get_values_for_type(x509.DNSName) + [str(ip) for ip in san.get_values_for_type(x509.IPAddress)]
+    except x509.ExtensionNotFound:
+        names = []
+    return names
+
+
+def _get_common_name(certificate) -> str:
+    attributes = certificate.subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
+    return attributes[0].value if attributes else ""
+
+
+def _matches_host(host: str, names: list) -> bool:
+    host = host.lower().rstrip(".")
+    for name in names:
+        name = name.lower().rstrip(".")
+        if name == host:
+            return True
+        if name.startswith("*.") and not is_ip_address(host) and host.count(".") == name.count(".") \
+                and host.split(".", 1)[1] == name[2:]:
+            return True
+    return False
+
+
+def _signature_row(certificate) -> tuple:
+    hash_algorithm = certificate.signature_hash_algorithm
+    hash_name = hash_algorithm.name.upper() if hash_algorithm else ""
+    key_type = certificate.public_key().__class__.__name__.replace("PublicKey", "").lstrip("_")
+    finding = f"{hash_name} with {key_type}".strip() if hash_name else certificate.signature_algorithm_oid._name
+    if hash_name == "MD5":
+        return "CRITICAL", finding
+    if hash_name == "SHA1":
+        return "MEDIUM", finding
+    return "OK", finding
+
+
+def _key_size_row(certificate) -> tuple:
+    key = certificate.public_key()
+    if isinstance(key, rsa.RSAPublicKey):
+        finding = f"RSA {key.key_size} bits"
+        return ("CRITICAL" if key.key_size < 1024 else "MEDIUM" if key.key_size < 2048 else "OK"), finding
+    if isinstance(key, ec.EllipticCurvePublicKey):
+        return ("MEDIUM" if key.key_size < 224 else "OK"), f"EC {key.key_size} bits"
+    if isinstance(key, dsa.DSAPublicKey):
+        return "MEDIUM", f"DSA {key.key_size} bits"
+    return "OK", key.__class__.__name__.replace("PublicKey", "").lstrip("_")
+
+
+def _expiration_row(certificate) -> tuple:
+    not_after = _not_valid_after(certificate)
+    remaining = not_after - datetime.now(timezone.utc)
+    finding = not_after.strftime("%Y-%m-%d %H:%M")
+    if remaining.total_seconds() < 0:
+        return "CRITICAL", finding
+    if remaining.days < 30:
+        return "MEDIUM", finding
+    if remaining.days < 60:
+        return "LOW", finding
+    return "OK", finding
+
+
+def _has_sct_extension(certificate) -> bool:
+    try:
+        certificate.extensions.get_extension_for_oid(SCT_OID)
+        return True
+    except x509.ExtensionNotFound:
+        return False
+
+
+async def _collect(host: str, ip: str, port: int, semaphore: asyncio.Semaphore) -> dict:
+    """Collects the chain, OCSP stapling and SCT TLS extension from one handshake."""
+    client_hello = build_client_hello(TLS1_2_VERSION, DEFAULT_CIPHER_SUITES, host, extensions=[
+        extension(EXT_STATUS_REQUEST, b"\x01\x00\x00\x00\x00"),
+        extension(EXT_SIGNED_CERTIFICATE_TIMESTAMP, b""),
+    ])
+    async with semaphore:
+        messages = await read_server_flight(ip, port, client_hello)
+
+    if messages is not None:
+        server_hello_extensions = parse_server_hello_extensions(messages[0][1])
+        chain = []
+        for message_type, body in messages:
+            if message_type == HANDSHAKE_CERTIFICATE:
+                chain = parse_certificate_message(body)
+        return {
+            "chain": chain,
+            "ocsp_stapling": any(message_type == HANDSHAKE_CERTIFICATE_STATUS for message_type, _ in messages),
+            "sct_tls_extension": EXT_SIGNED_CERTIFICATE_TIMESTAMP in server_hello_extensions,
+        }
+
+    # TLS 1.3 only server: certificate messages are encrypted, use the ssl module
+    async with semaphore:
+        handshake = await tls_handshake(ip, port, create_probe_context(ssl.TLSVersion.TLSv1_3), host)
+    if handshake is None:
+        return None
+    return {
+        "chain": handshake["chain"] or [handshake["certificate"]],
+        "ocsp_stapling": None,
+        "sct_tls_extension": None,
+    }
+
+
+async def probe_certificate(host: str, ip: str, port: int, semaphore: asyncio.Semaphore, helpers: object) -> list:
+    """
+    Inspects the server certificate.
+
+    Args:
+        host (str): Host name (used for SNI and name matching).
+        ip (str): Address to connect to.
+        port (int): Port to connect to.
+        semaphore (asyncio.Semaphore): Limits concurrent connections to the host.
+        helpers (Helpers): Shared helpers (unused).
+
+    Returns:
+        list: Findings shaped like the certificate part of the testssl `server_defaults`
+              section, with the rows TSD reads at their testssl offsets.
+
+    Raises:
+        TlsProbeError: If the host cannot be connected to.
+    """
+    collected = await _collect(host, ip, port, semaphore)
+    if not collected or not collected["chain"]:
+        return []
+
+    certificates = [x509.load_der_x509_certificate(der) for der in collected["chain"]]
+    leaf, intermediates = certificates[0], certificates[1:]
+    names = _get_names(leaf)
+    common_name = _get_common_name(leaf)
+    valid, reason = await asyncio.to_thread(_validate, leaf, intermediates)
+
+    if collected["ocsp_stapling"] is None:
+        ocsp = ("INFO", "not tested (TLS 1.3 only server)")
+    else:
+        ocsp = ("OK", "offered") if collected["ocsp_stapling"] else ("LOW", "not offered")
+
+    if _has_sct_extension(leaf):
+        transparency = ("OK", "yes (certificate extension)")
+    elif collected["sct_tls_extension"]:
+        transparency = ("OK", "yes (TLS extension)")
+    else:
+        transparency = ("LOW", "no")
+
+    rows = {
+        "cert_signatureAlgorithm": _signature_row(leaf),
+        "cert_keySize": _key_size_row(leaf),
+        "cert_serialNumber": ("INFO", format(leaf.serial_number, "X")),
+        "cert_fingerprintSHA1": ("INFO", hashlib.sha1(collected["chain"][0]).hexdigest().upper()),
+        "cert_fingerprintSHA256": ("INFO", hashlib.sha256(collected["chain"][0]).hexdigest().upper()),
+        "cert_commonName": ("OK", common_name),
+        "cert_subjectAltName": ("INFO", " ".join(names) or "missing"),
+        "cert_trust": ("OK", "Ok via SAN") if _matches_host(host, names or [common_name])
+                      else ("HIGH", "certificate does not match supplied URI"),
+        "cert_chain_of_trust": ("OK", "passed.") if valid else ("CRITICAL", f"failed ({reason})."),
+        "cert_notBefore": ("INFO", _not_valid_before(leaf).strftime("%Y-%m-%d %H:%M")),
+        "cert_notAfter": _expiration_row(leaf),
+        "certs_countServer": ("INFO", str(len(certificates))),
+        "OCSP_stapling": ocsp,
+        "certificate_transparency": transparency,
+    }
+
+    section = []
+    for row_id in SECTION_LAYOUT:
+        severity, finding = rows.get(row_id, ("INFO", "not collected by native engine"))
+        section.append({"id": row_id, "ip": f"{host}/{ip}", "port": str(port), "severity": severity, "finding": finding})
+    return section
@@ -0,0 +1,86 @@
+"""
+Native cipher category engine – replaces the testssl `cipher_categories` section.
+
+Every category is probed by a handshake offering only the cipher suites of
+that category. The handshakes are hand-built, so categories the local
+OpenSSL no longer implements (NULL, EXPORT, ...) can be probed as well.
+All TLS 1.3 suites are strong with forward secrecy, so a TLS 1.3 handshake
+also counts for STRONG_FS.
+"""
+
+import asyncio
+import ssl
+
+from ._tls import TLS1_2_VERSION, build_client_hello, send_client_hello, create_probe_context, tls_handshake
+
+# Category id -> (IANA cipher suites, (severity, finding) if offered, (severity, finding) if not offered)
+CIPHER_CATEGORIES = {
+    "cipherlist_NULL": (
+        [0x0001, 0x0002, 0x003B, 0xC001, 0xC006, 0xC00B, 0xC010, 0x002C, 0x002D, 0x002E, 0x00B0, 0x00B1, 0x00B4, 0x00B5, 0x00B8, 0x00B9],
+        ("HIGH", "offered"), ("OK", "not offered")),
+    "cipherlist_aNULL": (
+        [0x0018, 0x001B, 0x0034, 0x003A, 0x006C, 0x006D, 0x00A6, 0x00A7, 0x0046, 0x0089, 0x00BF, 0x00C5, 0xC015, 0xC016, 0xC017, 0xC018, 0xC019],
+        ("HIGH", "offered"), ("OK", "not offered")),
+    "cipherlist_EXPORT": (
+        [0x0003, 0x0006, 0x0008, 0x000B, 0x000E, 0x0011, 0x0014, 0x0017, 0x0019, 0x0062, 0x0063, 0x0064, 0x0065],
+        ("HIGH", "offered"), ("OK", "not offered")),
+    "cipherlist_LOW": (
+        [0x0004, 0x0005, 0x0009, 0x000C, 0x000F, 0x0012, 0x0015, 0x0066, 0xC002, 0xC007, 0xC00C, 0xC011],
+        ("HIGH", "offered"), ("OK", "not offered")),
+    "cipherlist_3DES_IDEA": (
+        [0x0007, 0x000A, 0x000D, 0x0010, 0x0013, 0x0016, 0xC003, 0xC008, 0xC00D, 0xC012],
+        ("MEDIUM", "offered"), ("OK", "not offered")),
+    "cipherlist_OBSOLETED": (
+        [0x002F, 0x0035, 0x003C, 0x003D, 0x0032, 0x0033, 0x0038, 0x0039, 0x0040, 0x0067, 0x006A, 0x006B,
+         0xC009, 0xC00A, 0xC013, 0xC014, 0xC023, 0xC024, 0xC027, 0xC028, 0x0041, 0x0045, 0x0084, 0x0088,
+         0x0096, 0x009A, 0xC004, 0xC005, 0xC00E, 0xC00F, 0xC025, 0xC026, 0xC029, 0xC02A],
+        ("LOW", "offered"), ("OK", "not offered")),
+    "cipherlist_STRONG_NOFS": (
+        [0x009C, 0x009D, 0xC09C, 0xC09D, 0xC0A0, 0xC0A1, 0xC050, 0xC051, 0xC07A, 0xC07B, 0xC02D, 0xC02E, 0xC031, 0xC032],
+        ("OK", "offered"), ("INFO", "not offered")),
+    "cipherlist_STRONG_FS": (
+        [0xC02B, 0xC02C, 0xC02F, 0xC030, 0xCCA8, 0xCCA9, 0xCCAA, 0x009E, 0x009F, 0x00A2, 0x00A3,
+         0xC0AC, 0xC0AD, 0xC0AE, 0xC0AF, 0xC09E, 0xC09F, 0xC05C, 0xC05D, 0xC060, 0xC061, 0xC086, 0xC087, 0xC08A, 0xC08B],
+        ("OK", "offered"), ("MEDIUM", "not offered")),
+}
+
+
+async def _is_category_offered(category: str, host: str, ip: str, port: int, semaphore: asyncio.Semaphore) -> bool:
+    suites = CIPHER_CATEGORIES[category][0]
+    async with semaphore:
+        server_hello = await send_client_hello(ip, port, build_client_hello(TLS1_2_VERSION, suites, host))
+    if server_hello is not None and server_hello[1] in suites:
+        return True
+    if category == "cipherlist_STRONG_FS":
+        async with semaphore:
+            return await tls_handshake(ip, port, create_probe_context(ssl.TLSVersion.TLSv1_3), host) is not None
+    return False
+
+
+async def probe_cipher_categories(host: str, ip: str, port: int, semaphore: asyncio.Semaphore, helpers: object) -> list:
+    """
+    Determines which cipher categories the server offers.
+
+    Args:
+        host (str): Host name (used for SNI).
+        ip (str): Address to connect to.
+        port (int): Port to connect to.
+        semaphore (asyncio.Semaphore): Limits concurrent connections to the host.
+        helpers (Helpers): Shared helpers (unused).
+
+    Returns:
+        list: Findings shaped like the testssl `cipher_categories` section
+              (cipherlist_NULL .. cipherlist_STRONG_FS).
+
+    Raises:
+        TlsProbeError: If the host cannot be connected to.
+    """
+    results = await asyncio.gather(*(
+        _is_category_offered(category, host, ip, port, semaphore) for category in CIPHER_CATEGORIES
+    ))
+
+    rows = []
+    for (category, (_, offered_finding, not_offered_finding)), offered in zip(CIPHER_CATEGORIES.items(), results):
+        severity, finding = offered_finding if offered else not_offered_finding
+        rows.append({"id": category, "ip": f"{host}/{ip}", "port": str(port), "severity": severity, "finding": finding})
+    return rows
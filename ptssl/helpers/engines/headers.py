@@ -0,0 +1,73 @@
+"""
+Native HTTP header engine – replaces the testssl `headers` section.
+
+Sends one plain `http://` request to test the HTTP -> HTTPS redirect and
+one `https://` request to read the HSTS header, both through the shared
+(connection pooling) `Helpers.http_client`.
+"""
+
+import asyncio
+import re
+
+HSTS_MIN_MAX_AGE = 15552000  # 180 days, the threshold used by testssl
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+def _redirect_finding(response) -> str:
+    if response is None:
+        return "no HTTP response on port 80"
+    location = response.headers.get("Location", "")
+    if response.status_code in REDIRECT_CODES and location.lower().startswith("https://"):
+        return f"{response.status_code} {response.reason} (\"{location}\")"
+    if response.status_code in REDIRECT_CODES:
+        return f"redirect to \"{location}\", not to HTTPS"
+    return f"{response.reason}, no redirect to HTTPS"
+
+
+def _hsts_finding(response) -> tuple:
+    if response is None:
+        return "WARN", "no HTTPS response, HSTS could not be checked"
+    header = response.headers.get("Strict-Transport-Security")
+    if header is None:
+        return "LOW", "not offered"
+    match = re.search(r"max-age\s*=\s*\"?(\d+)", header, re.IGNORECASE)
+    if not match:
+        return "LOW", f"invalid header \"{header}\""
+    max_age = int(match.group(1))
+    if max_age == 0:
+        return "LOW", "HSTS max-age is set to 0. HSTS is disabled"
+    comparison = "<" if max_age < HSTS_MIN_MAX_AGE else ">="
+    finding = f"{max_age // 86400} days (={max_age} seconds) {comparison} {HSTS_MIN_MAX_AGE} seconds"
+    return ("LOW", finding + ", too short") if max_age < HSTS_MIN_MAX_AGE else ("OK", finding)
+
+
+async def probe_headers(host: str, ip: str, port: int, semaphore: asyncio.Semaphore, helpers: object) -> list:
+    """
+    Checks the HTTP -> HTTPS redirect and the HSTS header.
+
+    Unlike testssl, whose HTTP_status_code row describes the HTTPS response,
+    the HTTP_status_code row here describes the answer to a plain HTTP request.
+
+    Args:
+        host (str): Host name.
+        ip (str): Resolved address (informational only, requests resolve the name themselves).
+        port (int): HTTPS port.
+        semaphore (asyncio.Semaphore): Limits concurrent connections to the host.
+        helpers (Helpers): Shared helpers providing the pooled HTTP client.
+
+    Returns:
+        list: Findings shaped like the testssl `headers` section (HTTP_status_code, HSTS).
+    """
+    https_url = f"https://{host}" if port == 443 else f"https://{host}:{port}"
+
+    async def fetch(url):
+        async with semaphore:
+            return await asyncio.to_thread(helpers.fetch, url)
+
+    http_response, https_response = await asyncio.gather(fetch(f"http://{host}"), fetch(https_url))
+    hsts_severity, hsts_finding = _hsts_finding(https_response)
+
+    return [
+        {"id": "HTTP_status_code", "ip": f"{host}/{ip}", "port": str(port), "severity": "INFO", "finding": _redirect_finding(http_response)},
+        {"id": "HSTS", "ip": f"{host}/{ip}", "port": str(port), "severity": hsts_severity, "finding": hsts_finding},
+    ]
@@ -0,0 +1,69 @@
+"""
+Native protocol engine – replaces the testssl `protocols` section.
+
+Probes every protocol version with its own concurrent handshake: SSLv2
+and SSLv3 - TLS 1.1 with hand-built ClientHello messages (local OpenSSL
+builds usually refuse them), TLS 1.2 and TLS 1.3 through the ssl module.
+"""
+
+import asyncio
+import ssl
+
+from ._tls import (
+    SSL3_VERSION, TLS1_VERSION, TLS1_1_VERSION, DEFAULT_CIPHER_SUITES,
+    build_client_hello, send_client_hello, send_sslv2_client_hello, create_probe_context, tls_handshake
+)
+
+# Findings and severities as reported by testssl: protocol id -> ((offered), (not offered))
+PROTOCOL_FINDINGS = {
+    "SSLv2":  (("CRITICAL", "offered"),              ("OK", "not offered")),
+    "SSLv3":  (("HIGH", "offered"),                  ("OK", "not offered")),
+    "TLS1":   (("LOW", "offered (deprecated)"),      ("INFO", "not offered")),
+    "TLS1_1": (("LOW", "offered (deprecated)"),      ("INFO", "not offered")),
+    "TLS1_2": (("OK", "offered"),                    ("MEDIUM", "not offered")),
+    "TLS1_3": (("OK", "offered with final"),         ("INFO", "not offered")),
+}
+
+RAW_VERSIONS = {"SSLv3": SSL3_VERSION, "TLS1": TLS1_VERSION, "TLS1_1": TLS1_1_VERSION}
+SSL_MODULE_VERSIONS = {"TLS1_2": ssl.TLSVersion.TLSv1_2, "TLS1_3": ssl.TLSVersion.TLSv1_3}
+
+
+async def _is_offered(protocol: str, host: str, ip: str, port: int) -> bool:
+    if protocol == "SSLv2":
+        return await send_sslv2_client_hello(ip, port)
+    if protocol in RAW_VERSIONS:
+        version = RAW_VERSIONS[protocol]
+        server_hello = await send_client_hello(ip, port, build_client_hello(version, DEFAULT_CIPHER_SUITES, host))
+        return server_hello is not None and server_hello[0] == version
+    context = create_probe_context(SSL_MODULE_VERSIONS[protocol])
+    return await tls_handshake(ip, port, context, host) is not None
+
+
+async def probe_protocols(host: str, ip: str, port: int, semaphore: asyncio.Semaphore, helpers: object) -> list:
+    """
+    Determines which protocol versions the server offers.
+
+    Args:
+        host (str): Host name (used for SNI).
+        ip (str): Address to connect to.
+        port (int): Port to connect to.
+        semaphore (asyncio.Semaphore): Limits concurrent connections to the host.
+        helpers (Helpers): Shared helpers (unused).
+
+    Returns:
+        list: Findings shaped like the testssl `protocols` section (SSLv2 .. TLS1_3).
+
+    Raises:
+        TlsProbeError: If the host cannot be connected to.
+    """
+    async def probe(protocol):
+        async with semaphore:
+            return await _is_offered(protocol, host, ip, port)
+
+    results = await asyncio.gather(*(probe(protocol) for protocol in PROTOCOL_FINDINGS))
+
+    rows = []
+    for (protocol, findings), offered in zip(PROTOCOL_FINDINGS.items(), results):
+        severity, finding = findings[0] if offered else findings[1]
+        rows.append({"id": protocol, "ip": f"{host}/{ip}", "port": str(port), "severity": severity, "finding": finding})
+    return rows
@@ -9,6 +9,8 @@ from ptlibs.http.http_client import HttpClient
 from ptlibs.ptprinthelper import ptprint
 
 class Helpers:
+    DEFAULT_TIMEOUT = 10  # seconds, used when no --timeout argument is available
+
     def __init__(self, args: object, ptjsonlib: object, http_client: object):
         """
         Helpers provides utility methods for loading definition files
@@ -17,6 +19,23 @@ class Helpers:
         self.args = args
         self.ptjsonlib = ptjsonlib
         self.http_client = http_client
+        self.incomplete_sections = set()
+
+    def report_missing_section(self, message: str) -> None:
+        """
+        Reports a testssl section a module could not find in the results.
+
+        If the testssl scan was cut short (see `--scan-timeout`), the section
+        is only marked as not evaluated. Otherwise the missing section is an
+        error, as before.
+
+        Args:
+            message (str): Description of the missing section.
+        """
+        if self.incomplete_sections:
+            ptprint(f"{message} (scan incomplete, not evaluated)", "WARNING", not self.args.json, indent=4)
+        else:
+            self.ptjsonlib.end_error(message, self.args.json)
 
     def fetch(self, url, allow_redirects=False):
         """
@@ -33,9 +52,9 @@ class Helpers:
             response = self.http_client.send_request(
                 url=url,
                 method="GET",
-                headers=self.args.headers,
+                headers=getattr(self.args, "headers", None),
                 allow_redirects=allow_redirects,
-                timeout=self.args.timeout
+                timeout=getattr(self.args, "timeout", None) or self.DEFAULT_TIMEOUT
             )
             return response
 
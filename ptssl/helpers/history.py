@@ -0,0 +1,83 @@
+"""
+Duration history – observed testssl wall times per target and profile.
+
+Runtimes are appended as JSON lines ({"target", "profile", "seconds"}), so
+recording is cheap and safe from concurrent processes. The file is compacted
+to the most recent runtimes of every target once it grows too large.
+Predictions are the median of the recent runtimes.
+"""
+
+import fcntl
+import json
+import os
+import statistics
+
+
+class DurationHistory:
+    HISTORY_SIZE = 5           # runtimes kept per target and profile
+    MAX_FILE_SIZE = 8 << 20    # compact the file once it is larger (bytes)
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): JSON lines file shared by all ptssl processes.
+        """
+        self.path = path
+        self._medians = None
+
+    def record(self, target: str, profile: str, seconds: float) -> None:
+        """Appends an observed runtime of a complete testssl run."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps({"target": target, "profile": profile, "seconds": round(seconds, 1)}) + "\n"
+        with open(self.path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(line)
+            f.flush()
+            if f.tell() > self.MAX_FILE_SIZE:
+                self._compact(f)
+
+    def predict(self, target: str, profile: str, default: float) -> float:
+        """
+        Returns the expected runtime of the target in seconds.
+
+        The history is read on the first call only.
+
+        Args:
+            target (str): Target URL.
+            profile (str): Scan profile.
+            default (float): Runtime assumed for targets without history.
+        """
+        if self._medians is None:
+            self._medians = {key: statistics.median(runtimes) for key, runtimes in self._load().items()}
+        return self._medians.get((target, profile), default)
+
+    def _load(self) -> dict:
+        """Returns (target, profile) -> recent runtimes, oldest first."""
+        try:
+            with open(self.path, "r") as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                return self._parse(f)
+        except OSError:
+            return {}
+
+    def _compact(self, f) -> None:
+        """Rewrites the locked history file keeping the recent runtimes of every target only."""
+        with open(self.path, "r") as reader:
+            runtimes = self._parse(reader)
+        f.seek(0)
+        f.truncate()
+        for (target, profile), history in runtimes.items():
+            for seconds in history:
+                f.write(json.dumps({"target": target, "profile": profile, "seconds": seconds}) + "\n")
+
+    def _parse(self, f) -> dict:
+        runtimes = {}
+        for line in f:
+            try:
+                entry = json.loads(line)
+                history = runtimes.setdefault((entry["target"], entry["profile"]), [])
+                history.append(entry["seconds"])
+            except (ValueError, KeyError):
+                continue
+            del history[:-self.HISTORY_SIZE]
+        return runtimes
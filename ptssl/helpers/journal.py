@@ -0,0 +1,67 @@
+"""
+Batch journal – append-only checkpoint log of a batch run.
+
+Every line is a JSON object {"time", "event", "target", ...} with the events
+queued, started, finished and failed; finished and failed lines carry the
+digest of the target result. A restarted batch reads the journal back and
+skips the targets whose last event is `finished`.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class Journal:
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Journal file, created if missing and appended to otherwise.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+        if self._file.tell() and not _ends_with_newline(path):
+            self._file.write("\n")  # terminate a line truncated by a killed run
+
+    def write(self, event: str, target: str, **fields) -> None:
+        """Appends one event; final events are synced to disk before returning."""
+        line = json.dumps({"time": round(time.time(), 3), "event": event, "target": target, **fields})
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if event in ("finished", "failed"):
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_completed(path: str) -> set:
+    """
+    Returns the targets whose last journal event is `finished`.
+
+    A truncated last line (the previous run was killed while writing) and lines
+    that are not journal events are ignored.
+
+    Args:
+        path (str): Journal file.
+    """
+    last_events = {}
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict) or not isinstance(entry.get("target"), str) or "event" not in entry:
+                continue
+            last_events[entry["target"]] = entry["event"]
+    return {target for target, event in last_events.items() if event == "finished"}
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
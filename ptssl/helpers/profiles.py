@@ -0,0 +1,87 @@
+"""
+Scan profiles – named testssl flag sets with their measured runtimes.
+
+Contains:
+- PROFILES mapping profile names to extra testssl flags and default tests.
+- ProfileRuntimes class recording observed runtimes of every profile in a
+  file shared by all ptssl processes and picking a profile for a time budget.
+"""
+
+import fcntl
+import json
+import os
+import statistics
+
+# Profile name -> extra testssl flags and the tests run by default (None = all tests)
+PROFILES = {
+    "quick": {
+        "flags": ["--fast", "--connect-timeout", "5", "--openssl-timeout", "5"],
+        "tests": None,
+    },
+    "standard": {
+        "flags": ["--sneaky", "--connect-timeout", "10", "--openssl-timeout", "10"],
+        "tests": None,
+    },
+    "full": {
+        "flags": [],
+        "tests": None,
+    },
+    "vuln-only": {
+        "flags": ["--connect-timeout", "10", "--openssl-timeout", "10"],
+        "tests": ["bvt"],
+    },
+}
+DEFAULT_PROFILE = "full"
+
+# Profiles considered for `--time-budget`, most thorough first
+BUDGET_ORDER = ("full", "standard", "quick")
+
+
+class ProfileRuntimes:
+    HISTORY_SIZE = 20  # runtimes kept per profile
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): JSON file with the runtimes, shared by all ptssl processes.
+        """
+        self.path = path
+
+    def record(self, profile: str, seconds: float) -> None:
+        """Adds an observed runtime of a complete testssl run of the profile."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                runtimes = json.loads(f.read() or "{}")
+            except ValueError:
+                runtimes = {}
+            history = runtimes.setdefault(profile, [])
+            history.append(round(seconds, 1))
+            del history[:-self.HISTORY_SIZE]
+            f.seek(0)
+            f.truncate()
+            json.dump(runtimes, f)
+
+    def median(self, profile: str) -> float:
+        """Returns the median runtime of the profile in seconds, or None if it was never measured."""
+        try:
+            with open(self.path, "r") as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                history = json.load(f).get(profile)
+        except (OSError, ValueError):
+            return None
+        return statistics.median(history) if history else None
+
+    def select(self, budget: float) -> str:
+        """
+        Returns the most thorough profile whose median runtime fits into the budget.
+
+        Profiles that were never measured do not fit; if none fits, `quick` is returned.
+        """
+        for profile in BUDGET_ORDER:
+            median = self.median(profile)
+            if median is not None and median <= budget:
+                return profile
+        return BUDGET_ORDER[-1]
@@ -0,0 +1,133 @@
+"""
+Host-wide slots – limit of testssl runs shared by all ptssl processes on the machine.
+
+Every slot is a file locked with `flock`; holding the lock means owning the
+slot. Processes waiting for a slot form a FIFO queue of wait files, each
+locked by its (living) owner, so the queue survives crashed waiters: an
+unlocked wait file belongs to a dead process and is removed. Only the head
+of the queue tries to take slots.
+"""
+
+import asyncio
+import fcntl
+import os
+import time
+import uuid
+
+from contextlib import asynccontextmanager
+
+
+class HostSlots:
+    POLL_INTERVAL = 0.5  # seconds between checks of the queue and the slots
+
+    def __init__(self, directory: str, slots: int, name: str = "testssl") -> None:
+        """
+        Args:
+            directory (str): Directory shared by all processes (slot and wait files).
+            slots (int): Number of slots on the machine.
+            name (str): Prefix of the slot and wait files.
+        """
+        self.directory = directory
+        self.slots = max(1, slots)
+        self.name = name
+
+    @asynccontextmanager
+    async def acquire(self, count: int = 1, on_wait=None):
+        """
+        Async context manager holding `count` slots; waits in FIFO order until they are free.
+
+        Args:
+            count (int): Number of slots needed, one per testssl process the holder runs.
+            on_wait (callable, optional): Called as `on_wait(position)` whenever the
+                1-based queue position changes, and with 0 once the slots are held.
+
+        Raises:
+            ValueError: If more slots than exist are requested.
+        """
+        if count > self.slots:
+            raise ValueError(f"Cannot hold {count} of {self.slots} slots")
+        os.makedirs(self.directory, exist_ok=True)
+        count = max(1, count)
+        wait_file, wait_path = self._enqueue()
+        held = []
+        try:
+            position = None
+            while True:
+                current = self._get_position(os.path.basename(wait_path))
+                if current != position:
+                    position = current
+                    if on_wait and position > 1:
+                        on_wait(position)
+                if position == 1:
+                    held.extend(self._try_slots(count - len(held)))
+                    if len(held) == count:
+                        break
+                await asyncio.sleep(self.POLL_INTERVAL)
+        except BaseException:
+            self._release(held)
+            raise
+        finally:
+            os.remove(wait_path)
+            wait_file.close()
+
+        try:
+            if on_wait:
+                on_wait(0)
+            yield
+        finally:
+            self._release(held)
+
+    def _enqueue(self) -> tuple:
+        """Creates the locked wait file of this waiter, its name orders the queue. Returns (file, path)."""
+        temp_path = os.path.join(self.directory, f"{self.name}.enqueue.{uuid.uuid4().hex}")
+        wait_file = open(temp_path, "w")
+        fcntl.flock(wait_file, fcntl.LOCK_EX)
+        # Locked before it appears under its queue name, so nobody takes it for a dead waiter
+        wait_path = os.path.join(self.directory, f"{self.name}.wait.{time.time_ns():020d}.{uuid.uuid4().hex}")
+        os.rename(temp_path, wait_path)
+        return wait_file, wait_path
+
+    def _get_position(self, own_name: str) -> int:
+        """Returns the 1-based queue position, removing wait files of dead processes."""
+        prefix = f"{self.name}.wait."
+        position = 1
+        for name in sorted(os.listdir(self.directory)):
+            if not name.startswith(prefix) or name >= own_name:
+                continue
+            if self._is_alive(os.path.join(self.directory, name)):
+                position += 1
+        return position
+
+    @staticmethod
+    def _is_alive(path: str) -> bool:
+        try:
+            with open(path, "r") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return True
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        return False
+
+    def _try_slots(self, count: int) -> list:
+        """Locks up to `count` free slot files without blocking."""
+        held = []
+        for index in range(self.slots):
+            if len(held) == count:
+                break
+            slot_file = open(os.path.join(self.directory, f"{self.name}.slot.{index}"), "a")
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                slot_file.close()
+                continue
+            held.append(slot_file)
+        return held
+
+    @staticmethod
+    def _release(held: list) -> None:
+        for slot_file in held:
+            slot_file.close()  # closing the file releases the lock
+        held.clear()
@@ -0,0 +1,158 @@
+"""
+Spool queue – work queue of target files shared by workers through a filesystem.
+
+Producers drop `<name>.target` files (one URL per line, written elsewhere and
+renamed into the spool) into the spool directory. A worker leases a file by
+renaming it to `<name>.target.<worker>.lease`; the lease expiry is kept in
+`<name>.target.<worker>.expires` and renewed while the worker is alive.
+Leases whose expiry passed are returned to the queue by any worker. Finished
+work leaves `<name>.result` next to `<name>.target.done`.
+
+Only atomic renames within one directory are used, so the queue also works
+on NFS mounts shared by several machines.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+
+TARGET_SUFFIX = ".target"
+
+
+class Lease:
+    def __init__(self, spool: "Spool", name: str) -> None:
+        """
+        Args:
+            spool (Spool): Spool the lease belongs to.
+            name (str): Name of the leased target file, e.g. `batch1.target`.
+        """
+        self.spool = spool
+        self.name = name
+        self.path = os.path.join(spool.directory, f"{name}.{spool.worker_id}.lease")
+        self.expires_path = os.path.join(spool.directory, f"{name}.{spool.worker_id}.expires")
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_periodically, daemon=True)
+
+    def __enter__(self) -> "Lease":
+        self._heartbeat.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._heartbeat.join()
+
+    def is_held(self) -> bool:
+        return os.path.exists(self.path)
+
+    def complete(self, result_path: str) -> bool:
+        """
+        Marks the target done and stores the result next to it.
+
+        The lease is claimed first (renamed to `.done`), so a lease reclaimed by
+        another worker meanwhile is detected before any result is published.
+
+        Args:
+            result_path (str): Finished result file in the spool directory, moved to `<name without .target>.result`.
+
+        Returns:
+            bool: False if the lease expired and was taken over meanwhile (the result is discarded).
+        """
+        base_name = self.name[:-len(TARGET_SUFFIX)]
+        try:
+            os.rename(self.path, os.path.join(self.spool.directory, f"{self.name}.done"))
+        except FileNotFoundError:
+            _remove_quietly(result_path)
+            return False
+        finally:
+            _remove_quietly(self.expires_path)
+        os.replace(result_path, os.path.join(self.spool.directory, f"{base_name}.result"))
+        return True
+
+    def _renew_periodically(self) -> None:
+        while not self._stop.wait(self.spool.lease_time / 3):
+            if not self.is_held():
+                return
+            self.spool._write_expiry(self.expires_path)
+
+
+class Spool:
+    POLL_INTERVAL = 5  # seconds between checks of an empty spool
+
+    def __init__(self, directory: str, lease_time: int = 300, worker_id: str = None) -> None:
+        """
+        Args:
+            directory (str): Spool directory.
+            lease_time (int): Seconds a lease stays valid without renewal.
+            worker_id (str, optional): Unique worker name. Defaults to host name and PID.
+        """
+        self.directory = directory
+        self.lease_time = lease_time
+        self.worker_id = (worker_id or f"{socket.gethostname()}-{os.getpid()}").replace(".", "_")
+
+    def lease(self):
+        """
+        Leases the oldest pending target file.
+
+        Returns:
+            Lease: The lease (use as context manager to keep it renewed), or None if nothing is pending.
+        """
+        self.reclaim_expired()
+        for name in self._list_pending():
+            lease = Lease(self, name)
+            # Expiry first, so no other worker sees a lease without expiry
+            self._write_expiry(lease.expires_path)
+            try:
+                os.rename(os.path.join(self.directory, name), lease.path)
+            except FileNotFoundError:
+                # Leased by another worker meanwhile
+                _remove_quietly(lease.expires_path)
+                continue
+            return lease
+        return None
+
+    def reclaim_expired(self) -> None:
+        """Returns leases whose expiry passed to the queue."""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".expires"):
+                continue
+            expires_path = os.path.join(self.directory, name)
+            try:
+                with open(expires_path, "r") as f:
+                    expires = float(f.read())
+            except (OSError, ValueError):
+                continue
+            if expires > now:
+                continue
+            lease_path = expires_path[:-len(".expires")] + ".lease"
+            target_name = name.rsplit(".", 2)[0]  # <name>.target.<worker>.expires
+            try:
+                os.rename(lease_path, os.path.join(self.directory, target_name))
+            except FileNotFoundError:
+                pass
+            _remove_quietly(expires_path)
+
+    def _list_pending(self) -> list:
+        pending = []
+        for name in os.listdir(self.directory):
+            if name.endswith(TARGET_SUFFIX):
+                try:
+                    pending.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+                except FileNotFoundError:
+                    continue
+        return [name for _, name in sorted(pending)]
+
+    def _write_expiry(self, path: str) -> None:
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(time.time() + self.lease_time))
+        os.replace(temp_path, path)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
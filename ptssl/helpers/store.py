@@ -0,0 +1,142 @@
+"""
+Result store – optional SQLite history of scan results.
+
+Every finished scan adds a row to `scans` (target, address, profile, time)
+and one row per finding id to `findings`. Host and scan time are repeated in
+`findings`, so questions such as "which hosts offered TLS1 last week" are
+answered from the indexes on host, time, finding id and severity alone.
+The database runs in WAL mode and may be written by several ptssl processes.
+"""
+
+import json
+import sqlite3
+
+from contextlib import closing
+from urllib.parse import urlparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id          INTEGER PRIMARY KEY,
+    target      TEXT NOT NULL,
+    host        TEXT NOT NULL,
+    port        INTEGER NOT NULL,
+    ip          TEXT,
+    profile     TEXT,
+    time        REAL NOT NULL,
+    duration    REAL,
+    incomplete  TEXT
+);
+CREATE TABLE IF NOT EXISTS findings (
+    scan_id     INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    host        TEXT NOT NULL,
+    time        REAL NOT NULL,
+    finding_id  TEXT NOT NULL,
+    severity    TEXT,
+    finding     TEXT,
+    cve         TEXT,
+    cwe         TEXT,
+    PRIMARY KEY (scan_id, finding_id)
+);
+CREATE INDEX IF NOT EXISTS scans_host ON scans (host);
+CREATE INDEX IF NOT EXISTS scans_time ON scans (time);
+CREATE INDEX IF NOT EXISTS findings_host ON findings (host);
+CREATE INDEX IF NOT EXISTS findings_time ON findings (time);
+CREATE INDEX IF NOT EXISTS findings_finding_id ON findings (finding_id);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings (severity);
+"""
+
+
+class ResultStore:
+    BUSY_TIMEOUT = 30  # seconds to wait for writes of other processes
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): SQLite database file, created with its schema if missing.
+        """
+        self.path = path
+
+    def record_scan(self, target: str, ip: str, profile: str, started: float, duration: float,
+                    findings: list, incomplete_sections=()) -> int:
+        """
+        Stores a finished scan with its findings.
+
+        Args:
+            target (str): Target URL.
+            ip (str): Scanned address, None if unknown.
+            profile (str): Scan profile.
+            started (float): Start of the scan (Unix time).
+            duration (float): Scan wall time in seconds.
+            findings (list): testssl findings; a repeated finding id keeps its last finding.
+            incomplete_sections (iterable): Sections left incomplete by `--scan-timeout`.
+
+        Returns:
+            int: Id of the scan row.
+        """
+        parsed = urlparse(target)
+        host = parsed.hostname
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO scans (target, host, port, ip, profile, time, duration, incomplete) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (target, host, parsed.port or 443, ip, profile, started, round(duration, 1),
+                 json.dumps(sorted(incomplete_sections)) if incomplete_sections else None)
+            )
+            scan_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT OR REPLACE INTO findings (scan_id, host, time, finding_id, severity, finding, cve, cwe) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(scan_id, host, started, item["id"], item.get("severity"), item.get("finding"), item.get("cve"), item.get("cwe"))
+                 for item in findings if item.get("id")]
+            )
+        return scan_id
+
+    def query(self, host: str = None, finding_id: str = None, severity: list = None, finding: str = None,
+              since: float = None, until: float = None, limit: int = None) -> list:
+        """
+        Returns stored findings matching all given conditions, newest first.
+
+        Args:
+            host (str, optional): Host name, shell-style wildcards allowed (e.g. `*.example.com`).
+            finding_id (str, optional): testssl finding id, wildcards allowed (e.g. `TLS1*`).
+            severity (list, optional): Accepted severities, e.g. ["HIGH", "CRITICAL"].
+            finding (str, optional): Finding text, wildcards allowed (e.g. `offered*`).
+            since (float, optional): Earliest scan time (Unix time).
+            until (float, optional): Latest scan time (Unix time).
+            limit (int, optional): Maximum number of rows.
+
+        Returns:
+            list: Dicts with time, target, host, port, ip, id, severity, finding, cve and cwe.
+        """
+        conditions, parameters = [], []
+        for column, pattern in (("f.host", host), ("f.finding_id", finding_id), ("f.finding", finding)):
+            if pattern is not None:
+                conditions.append(f"{column} GLOB ?")
+                parameters.append(pattern)
+        if severity:
+            conditions.append(f"f.severity IN ({', '.join('?' * len(severity))})")
+            parameters.extend(value.upper() for value in severity)
+        if since is not None:
+            conditions.append("f.time >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("f.time <= ?")
+            parameters.append(until)
+
+        sql = ("SELECT f.time, s.target, f.host, s.port, s.ip, f.finding_id, f.severity, f.finding, f.cve, f.cwe "
+               "FROM findings f JOIN scans s ON s.id = f.scan_id")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY f.time DESC, f.host"
+        if limit:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        columns = ("time", "target", "host", "port", "ip", "id", "severity", "finding", "cve", "cwe")
+        with closing(self._connect()) as connection, connection:
+            return [dict(zip(columns, row)) for row in connection.execute(sql, parameters)]
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(SCHEMA)
+        return connection
@@ -0,0 +1,305 @@
+"""
+Testssl helpers – shared knowledge about the testssl.sh report layout.
+
+Every test module declares which testssl sections it reads through its
+`__TESTSSL_SECTIONS__` attribute. The helpers below translate such
+declarations into the smallest set of testssl command line flags and
+follow the JSON report while testssl is still writing it.
+"""
+
+import codecs
+import functools
+import json
+import subprocess
+
+# Sections in the order in which testssl.sh runs them.
+SECTION_ORDER = (
+    "protocols",
+    "grease",
+    "cipher_categories",
+    "fs",
+    "server_preferences",
+    "server_defaults",
+    "headers",
+    "vulnerabilities",
+)
+
+# testssl.sh flags needed to produce each section.
+SECTION_FLAGS = {
+    "protocols":          ["-p"],
+    "grease":             ["-g"],
+    "cipher_categories":  ["-s"],
+    "fs":                 ["-f"],
+    "server_preferences": ["-P"],
+    "server_defaults":    ["-S"],
+    "headers":            ["-h"],
+    "vulnerabilities":    ["-U"],
+}
+
+
+def build_testssl_flags(sections) -> list:
+    """
+    Builds the testssl.sh flags covering all requested sections.
+
+    Args:
+        sections (iterable): Section names from `SECTION_ORDER`.
+
+    Returns:
+        list: Flags in the order testssl runs the sections, without duplicates.
+
+    Raises:
+        ValueError: If an unknown section name is requested.
+    """
+    sections = set(sections)
+    unknown = sections - set(SECTION_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown testssl section(s): {', '.join(sorted(unknown))}")
+
+    flags = []
+    for section in SECTION_ORDER:
+        if section in sections:
+            flags.extend(flag for flag in SECTION_FLAGS[section] if flag not in flags)
+    return flags
+
+
+# Rules assigning a testssl finding id to its section: (exact ids, id prefixes).
+SECTION_IDS = {
+    "protocols":          ({"SSLv2", "SSLv3", "TLS1", "TLS1_1", "TLS1_2", "TLS1_3", "NPN", "ALPN", "ALPN_HTTP2"}, ()),
+    "grease":             ({"GREASE"}, ()),
+    "cipher_categories":  (set(), ("cipherlist_",)),
+    "fs":                 ({"FS", "DH_groups"}, ("FS_",)),
+    "server_preferences": ({"protocol_negotiated", "cipher_negotiated"}, ("cipher_order", "cipherorder_")),
+    "server_defaults":    ({"TLS_extensions", "TLS_session_ticket", "SSL_sessionID_support", "TLS_timestamp", "DNS_CAArecord"},
+                           ("sessionresumption_", "cert", "OCSP_", "intermediate_cert")),
+    "headers":            ({"security_headers"}, ("HTTP_", "HSTS", "HPKP", "banner_", "cookie_", "X-", "Cache-Control", "Pragma")),
+    "vulnerabilities":    ({"heartbleed", "CCS", "ticketbleed", "ROBOT", "secure_renego", "secure_client_renego", "CRIME_TLS",
+                            "BREACH", "POODLE_SSL", "fallback_SCSV", "SWEET32", "FREAK", "DROWN", "DROWN_hint", "LOGJAM",
+                            "LOGJAM-common_primes", "LUCKY13", "winshock", "RC4", "opossum"}, ("BEAST",)),
+}
+
+# Ids after which a section is known to be complete without waiting for the next one.
+SECTION_LAST_IDS = {
+    "protocols":         "TLS1_3",
+    "grease":            "GREASE",
+    "cipher_categories": "cipherlist_STRONG_FS",
+}
+
+
+def get_section_of_id(item_id: str):
+    """
+    Returns the name of the testssl section a finding id belongs to.
+
+    Args:
+        item_id (str): The `id` field of a testssl JSON finding.
+
+    Returns:
+        str | None: Section name, or None if the id is not recognized.
+    """
+    for section, (ids, prefixes) in SECTION_IDS.items():
+        if item_id in ids or item_id.startswith(prefixes):
+            return section
+    return None
+
+
+class TestsslJsonReader:
+    """
+    Incrementally reads the flat JSON file testssl writes with `--jsonfile`.
+
+    testssl appends findings to the file while it runs and closes the JSON
+    array only when it exits. Each call to `read()` parses the findings
+    written since the previous call and leaves incomplete data for later.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.items = []
+        self._offset = 0
+        self._buffer = ""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+
+    def read(self) -> list:
+        """
+        Parses findings appended to the file since the last call.
+
+        Returns:
+            list: Newly parsed findings (they are also appended to `self.items`).
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+                self._offset = f.tell()
+        except FileNotFoundError:
+            return []
+
+        self._buffer += self._utf8.decode(chunk)
+        new_items = []
+        position = 0
+        while True:
+            while position < len(self._buffer) and self._buffer[position] in " \t\r\n,[]":
+                position += 1
+            if position >= len(self._buffer):
+                break
+            try:
+                item, position = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                break
+            new_items.append(item)
+        self._buffer = self._buffer[position:]
+        self.items.extend(new_items)
+        return new_items
+
+
+class SectionTracker:
+    """
+    Tracks which testssl sections are complete while findings stream in.
+
+    testssl runs its sections one after another, so a section is complete
+    once a finding of a different section arrives, once its last known id
+    has been seen, or once testssl exits.
+    """
+
+    def __init__(self) -> None:
+        self.current = None
+        self.started = []
+        self.completed = set()
+
+    def feed(self, items: list) -> set:
+        """
+        Processes new findings.
+
+        Args:
+            items (list): Findings in the order testssl wrote them.
+
+        Returns:
+            set: Sections completed by these findings.
+        """
+        newly_completed = set()
+        for item in items:
+            section = get_section_of_id(item.get("id", ""))
+            if section is None:
+                continue
+            if section != self.current:
+                if self.current is not None and self.current not in self.completed:
+                    self.completed.add(self.current)
+                    newly_completed.add(self.current)
+                self.current = section
+                if section not in self.started:
+                    self.started.append(section)
+            if SECTION_LAST_IDS.get(section) == item.get("id") and section not in self.completed:
+                self.completed.add(section)
+                newly_completed.add(section)
+        return newly_completed
+
+    def finish(self) -> set:
+        """
+        Marks every section as complete once testssl has exited.
+
+        Returns:
+            set: Sections completed by this call.
+        """
+        newly_completed = set(SECTION_ORDER) - self.completed
+        self.completed.update(newly_completed)
+        return newly_completed
+
+
+# Independent groups of sections that can be scanned by concurrent testssl processes.
+SPLIT_GROUPS = (
+    ("protocols", "grease", "fs", "server_preferences", "server_defaults"),
+    ("cipher_categories",),
+    ("vulnerabilities",),
+    ("headers",),
+)
+
+
+def split_sections(sections, max_groups: int = None) -> list:
+    """
+    Splits requested sections into groups scanned by separate testssl processes.
+
+    Args:
+        sections (iterable): Section names from `SECTION_ORDER`.
+        max_groups (int, optional): Maximum number of groups; the last groups are merged to fit.
+
+    Returns:
+        list: Non-empty lists of sections, in `SPLIT_GROUPS` order.
+    """
+    sections = set(sections)
+    groups = []
+    for group in SPLIT_GROUPS:
+        requested = [section for section in group if section in sections]
+        if requested:
+            groups.append(requested)
+    while max_groups and len(groups) > max(1, max_groups):
+        last = groups.pop()
+        groups[-1] = sorted(groups[-1] + last, key=SECTION_ORDER.index)
+    return groups
+
+
+def merge_results(results: list) -> list:
+    """
+    Merges findings of several testssl runs into one ordered list.
+
+    Findings keep the order of their run, and runs keep the given order, so
+    every section stays contiguous as the test modules expect. Findings that
+    repeat verbatim in several runs (e.g. scan metadata) are kept only once.
+
+    Args:
+        results (list): Lists of findings, one per testssl run.
+
+    Returns:
+        list: Merged findings.
+    """
+    merged = []
+    seen = set()
+    for result in results:
+        for item in result:
+            key = json.dumps(item, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def filter_sections(items: list, sections) -> list:
+    """
+    Keeps only findings of the given sections.
+
+    Findings written before the first recognized section (scan metadata)
+    are kept as well. Unrecognized ids belong to the preceding section.
+
+    Args:
+        items (list): Findings in the order testssl wrote them.
+        sections (iterable): Section names to keep.
+
+    Returns:
+        list: Filtered findings.
+    """
+    sections = set(sections)
+    kept = []
+    current = None
+    for item in items:
+        current = get_section_of_id(item.get("id", "")) or current
+        if current is None or current in sections:
+            kept.append(item)
+    return kept
+
+
+@functools.lru_cache(maxsize=None)
+def get_testssl_version(executable: str = "testssl") -> str:
+    """
+    Returns the output of `testssl --version` (version and bundled OpenSSL).
+
+    Runs testssl once per process; the result is reused for all scans.
+
+    Args:
+        executable (str): testssl.sh command.
+
+    Returns:
+        str: Stripped version output, empty if testssl cannot report it.
+    """
+    try:
+        completed = subprocess.run([executable, "--version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return "\n".join(line.strip() for line in completed.stdout.splitlines() if line.strip())
@@ -15,6 +15,7 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing common vulnerabilities:"
+__TESTSSL_SECTIONS__ = ["vulnerabilities"]
 
 
 class BVT:
@@ -53,7 +54,7 @@ class BVT:
         """
         id_section = self._find_section_bv()
         if id_section == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide vulnerability section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide vulnerability section")
             return
 
         for item in self.testssl_result[id_section:id_section + self.VULN_SEC_LEN]:
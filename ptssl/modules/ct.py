@@ -15,6 +15,7 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing for supported ciphers:"
+__TESTSSL_SECTIONS__ = ["cipher_categories"]
 
 
 class CT:
@@ -54,7 +55,7 @@ class CT:
         """
         id_section = self._find_section_c()
         if id_section == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide cipher section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide cipher section")
             return
 
         for item in self.testssl_result[id_section:id_section + self.CIPHER_SEC_LEN]:
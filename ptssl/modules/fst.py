@@ -15,6 +15,7 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing if Forward Security is offered:"
+__TESTSSL_SECTIONS__ = ["fs"]
 
 
 class FST:
@@ -52,7 +53,7 @@ class FST:
         """
         id_fs = self._find_section_fs()
         if id_fs == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide FS section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide FS section")
             return
         item = self.testssl_result[id_fs]
 
@@ -15,6 +15,7 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing for bugs:"
+__TESTSSL_SECTIONS__ = ["grease"]
 
 
 class GT:
@@ -15,6 +15,8 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing if HSTS is offered:"
+__TESTSSL_SECTIONS__ = ["headers"]
+__SNI_DEPENDENT__ = True
 
 
 class HSTST:
@@ -52,7 +54,7 @@ class HSTST:
         """
         id_grease = self._find_section_hsts()
         if id_grease == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide HSTS section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide HSTS section")
             return
         item = self.testssl_result[id_grease]
 
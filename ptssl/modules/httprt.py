@@ -15,6 +15,8 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing HTTP redirection:"
+__TESTSSL_SECTIONS__ = ["headers"]
+__SNI_DEPENDENT__ = True
 
 
 class HTTPRT:
@@ -52,7 +54,7 @@ class HTTPRT:
         """
         id_https = self._find_section_https()
         if id_https == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide http status code", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide http status code")
             return
         item = self.testssl_result[id_https]
 
@@ -15,6 +15,7 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing who gives order of ciphers:"
+__TESTSSL_SECTIONS__ = ["server_preferences"]
 
 
 class PCT:
@@ -54,7 +55,7 @@ class PCT:
         """
         id_section = self._find_section_pc()
         if id_section == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide cipher order section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide cipher order section")
             return
 
         item = self.testssl_result[id_section]
@@ -16,6 +16,7 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing for allowed protocols:"
+__TESTSSL_SECTIONS__ = ["protocols"]
 
 class PT:
     """
@@ -54,7 +55,7 @@ class PT:
         """
         id_section = self._find_section_p()
         if id_section == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide protocol section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide protocol section")
             return
 
         for item in self.testssl_result[id_section:id_section + self.PRO_SEC_LEN]:
@@ -14,6 +14,8 @@ from ptlibs import ptjsonlib
 from ptlibs.ptprinthelper import ptprint
 
 __TESTLABEL__ = "Testing server defaults:"
+__TESTSSL_SECTIONS__ = ["server_defaults"]
+__SNI_DEPENDENT__ = True
 
 
 class TSD:
@@ -67,7 +69,7 @@ class TSD:
         """
         id_section = self._find_section_tsd()
         if id_section == self.ERROR_NUM:
-            self.ptjsonlib.end_error("testssl could not provide server's default section", self.args.json)
+            self.helpers.report_missing_section("testssl could not provide server's default section")
             return
 
         id_of_vulnerability = [self.CERT_SIG_ALGO, self.CERT_KEY_SIZE, self.CERT_CHAIN_OF_TRUST, self.CERT_TRUST,
@@ -17,6 +17,7 @@ along with ptssl.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import argparse
+import asyncio
 import importlib
 import os
 import threading
@@ -28,97 +29,363 @@ import json
 import hashlib
 import sys; sys.path.append(__file__.rsplit("/", 1)[0])
 import fcntl
+import signal
 import uuid
+import sqlite3
+import datetime
 
 from io import StringIO
 from types import ModuleType
 from urllib.parse import urlparse, urlunparse
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 
 from ptlibs import ptjsonlib, ptmisclib, ptnethelper
 from ptlibs.ptprinthelper import ptprint, print_banner, help_print, get_colored_text
-from ptlibs.threads import ptthreads, printlock
+from ptlibs.threads import printlock
 from ptlibs.http.http_client import HttpClient
 
 from helpers._thread_local_stdout import ThreadLocalStdout
 from helpers.helpers import Helpers
+from helpers.batch import BatchRunner, read_targets, get_endpoint_fingerprint, cluster_targets
+from helpers.slots import HostSlots
+from helpers.dns_cache import DnsCache
+from helpers.profiles import PROFILES, DEFAULT_PROFILE, ProfileRuntimes
+from helpers.history import DurationHistory
+from helpers.circuit import CircuitBreaker
+from helpers.cache import ResultCache, CacheManager, FULL_SCAN
+from helpers.store import ResultStore
+from helpers.journal import Journal, read_completed
+from helpers.spool import Spool
+from helpers.engines import NATIVE_ENGINES, NativeEngineError, run_native_engines
+from helpers.testssl import build_testssl_flags, split_sections, merge_results, filter_sections, get_testssl_version, SECTION_ORDER, TestsslJsonReader, SectionTracker
 from _version import __version__
 
 import requests
 
 class PtSSL:
-    def __init__(self, args):
+    STREAM_POLL_INTERVAL = 0.5  # seconds between reads of the growing testssl JSON file
+    CACHE_EXPIRY_SECONDS = 30 * 60 # 30 mins, default of --cache-ttl
+    QUICK_TIER_SECTIONS  = ("protocols", "cipher_categories", "server_defaults")
+    KILL_GRACE_PERIOD    = 5    # seconds between SIGTERM and SIGKILL of a timed out testssl
+
+    def __init__(self, args, output=None, dns_cache=None):
+        """
+        Args:
+            args (argparse.Namespace): Parsed command line arguments.
+            output (StringIO, optional): Buffer collecting all output of this scan (used in batch mode).
+                When set, no spinner or live testssl output is shown.
+            dns_cache (DnsCache, optional): Resolver cache shared by the scans of one process.
+        """
         self.ptjsonlib   = ptjsonlib.PtJsonLib()
-        self.ptthreads   = ptthreads.PtThreads()
         self._lock       = threading.Lock()
         self.args        = args
+        self.output      = output
         self.http_client = HttpClient(args=self.args, ptjsonlib=self.ptjsonlib)
         self.helpers     = Helpers(args=self.args, ptjsonlib=self.ptjsonlib, http_client=self.http_client)
-
-        self.testssl_result = self._run_testssl(args.url)
-
-        # Activate ThreadLocalStdout stdout proxy
-        self.thread_local_stdout = ThreadLocalStdout(sys.stdout)
-        self.thread_local_stdout.activate()
+        self.profile     = self.args.profile or DEFAULT_PROFILE
+        self.tests       = self.args.tests or PROFILES[self.profile]["tests"] or _get_all_available_modules()
+
+        self.module_sections  = self._get_module_sections(self.tests)
+        self.testssl_sections = self._get_testssl_sections(self.module_sections)
+        self.native_sections  = self._get_native_sections(self.testssl_sections)
+        if self.native_sections:
+            self.testssl_sections -= self.native_sections
+        self.profile_sections = self._get_profile_sections()
+        self.testssl_flags    = build_testssl_flags(self.testssl_sections) if self.testssl_sections is not None else []
+        self.testssl_result   = None
+        self.incomplete_sections = set()
+        self.cache_max_age    = self.args.cache_ttl
+        self.section_max_age  = dict(self.args.section_ttl or [])
+        self.queue_position   = 0
+        self.dns_cache        = dns_cache or DnsCache(self.args.dns_ttl)
+
+        self.thread_local_stdout = _activate_thread_local_stdout()
 
     def run(self) -> None:
         """Main method"""
-        tests = self.args.tests or _get_all_available_modules()
-        self.ptthreads.threads(tests, self.run_single_module, self.args.threads)
+        asyncio.run(self.run_async())
+
+    async def run_async(self) -> None:
+        """
+        Scans the target within the running event loop.
+
+        Runs the native engines (if selected) and testssl, and dispatches every
+        module as soon as all testssl sections it depends on are complete, so
+        results of early sections are shown while testssl is still scanning the rest.
+        Modules run in worker threads, at most `--threads` at once.
+        With `--store`, the findings are added to the SQLite result store.
+        """
+        started = time.time()
+        pending_tests = list(self.tests)
+        module_semaphore = asyncio.Semaphore(max(1, self.args.threads))
+        module_tasks = []
+
+        async def run_module(module_name: str, testssl_result: list) -> None:
+            async with module_semaphore:
+                try:
+                    await asyncio.to_thread(self.run_single_module, module_name, testssl_result)
+                except SystemExit:
+                    # end_error() of a module already reported the error
+                    pass
+
+        def dispatch_ready_modules(testssl_result: list, completed_sections: set) -> None:
+            for module_name in list(pending_tests):
+                sections = self.module_sections.get(module_name)
+                if sections is not None and set(sections) <= completed_sections:
+                    pending_tests.remove(module_name)
+                    module_tasks.append(asyncio.create_task(run_module(module_name, testssl_result)))
+
+        if not self.args.ignore_circuit:
+            reason = await self.check_circuit(self.args.url)
+            if reason:
+                self.ptjsonlib.end_error(f"Target skipped, circuit open: {reason}", condition=self.args.json)
+
+        try:
+            native_result = await self._run_native_engines(self.args.url) if self.native_sections else []
+            dispatch_ready_modules(native_result, set(self.native_sections))
+
+            if self.testssl_sections is None or self.testssl_sections:
+                quick_digest = await self._run_quick_tier(self.args.url, native_result) if self.args.adaptive else None
+                testssl_result = await self._run_testssl(
+                    self.args.url,
+                    on_sections_complete=lambda findings, completed: dispatch_ready_modules(
+                        merge_results([native_result, findings]), completed | self.native_sections)
+                )
+                if quick_digest and not self.incomplete_sections:
+                    self._save_quick_digest(self.args.url, quick_digest)
+            else:
+                testssl_result = []
+
+            self.testssl_result = merge_results([native_result, testssl_result])
+            for module_name in pending_tests:
+                module_tasks.append(asyncio.create_task(run_module(module_name, self.testssl_result)))
+            await asyncio.gather(*module_tasks)
+        except BaseException:
+            for task in module_tasks:
+                task.cancel()
+            raise
+
+        if self.incomplete_sections:
+            self.ptjsonlib.add_properties({"incompleteSections": sorted(self.incomplete_sections)})
+        else:
+            # Closes the circuit whichever engine or cache produced the results
+            await self._record_success(self.args.url)
+
+        if self.args.store:
+            await asyncio.to_thread(self._store_result, started)
 
         self.ptjsonlib.set_status("finished")
         ptprint(self.ptjsonlib.get_result_json(), "", self.args.json)
 
+    def _store_result(self, started: float) -> None:
+        """Adds the findings of the finished scan to the `--store` database; failures are only reported."""
+        try:
+            ResultStore(self.args.store).record_scan(
+                self.args.url, self.dns_cache.resolve(urlparse(self.args.url).hostname), self.profile,
+                started, time.time() - started, self.testssl_result, self.incomplete_sections
+            )
+        except sqlite3.Error as e:
+            ptprint(f"Cannot store results in {self.args.store}: {e}", "WARNING", not self.args.json, clear_to_eol=True)
+
+    def _get_module_sections(self, tests: list) -> dict:
+        """
+        Collects the testssl sections each selected module depends on.
+
+        Every module declares the testssl sections it reads in its
+        `__TESTSSL_SECTIONS__` attribute.
+
+        Args:
+            tests (list): Names of the modules to run.
+
+        Returns:
+            dict: Module name -> list of sections, or None if the module
+                  does not declare its sections. Modules that cannot be
+                  loaded are left out.
+        """
+        module_sections = {}
+        for module_name in tests:
+            try:
+                module = _import_module_from_path(module_name)
+            except Exception:
+                # Missing modules are reported later by run_single_module
+                continue
+            module_sections[module_name] = getattr(module, "__TESTSSL_SECTIONS__", None) or None
+        return module_sections
+
+    def _get_testssl_sections(self, module_sections: dict):
+        """
+        Returns the testssl sections needed by the selected tests.
+
+        If any module does not declare its sections, None is returned,
+        which makes testssl run its full default scan.
+
+        Args:
+            module_sections (dict): Output of `_get_module_sections`.
+
+        Returns:
+            set | None: Section names, or None for a full scan.
+        """
+        sections = set()
+        for declared in module_sections.values():
+            if declared is None:
+                return None
+            sections.update(declared)
+        return sections
+
+    def _get_native_sections(self, testssl_sections) -> set:
+        """
+        Returns the sections produced by native engines instead of testssl.
+
+        Native engines are used with `--engine native` for every requested
+        section that has one; the remaining sections are still scanned by testssl.
+
+        Args:
+            testssl_sections (set | None): Output of `_get_testssl_sections`.
+
+        Returns:
+            set: Section names.
+        """
+        if self.args.engine != "native" or testssl_sections is None:
+            return set()
+        return {section for section in testssl_sections if section in NATIVE_ENGINES}
+
+    async def _run_native_engines(self, url: str) -> list:
+        """
+        Produces the native sections without testssl.
+
+        Args:
+            url (str): Target URL.
+
+        Returns:
+            list: Findings shaped like the testssl sections they replace.
+        """
+        try:
+            return await run_native_engines(url, self.native_sections, self.args.native_connections, self.helpers,
+                                            ip=await self._resolve(url))
+        except NativeEngineError as e:
+            await self._record_failure(url, str(e))
+            self.ptjsonlib.end_error("Native engine failed:", details=str(e), condition=self.args.json)
+
+    async def _run_quick_tier(self, url: str, native_result: list = None) -> str:
+        """
+        Runs the cheap first tier of `--adaptive` scanning.
+
+        Native engines probe protocols, cipher categories and (if available)
+        the certificate. If every finding is OK/INFO and matches the digest stored
+        after the last full scan, a cached full testssl result up to `--adaptive-ttl`
+        old is accepted. Otherwise the full scan is forced.
 
-    def _run_testssl(self, url) -> None:
+        Args:
+            url (str): Target URL.
+            native_result (list, optional): Findings of `_run_native_engines`; the sections
+                they cover (with `--engine native`) are not probed again.
+
+        Returns:
+            str: Digest of the quick tier findings, or None if the quick tier failed.
+        """
+        sections = [section for section in self.QUICK_TIER_SECTIONS if section in NATIVE_ENGINES]
+        reused_sections = [section for section in sections if section in self.native_sections]
+        findings = filter_sections(native_result or [], reused_sections) if reused_sections else []
+        probe_sections = [section for section in sections if section not in self.native_sections]
+        if probe_sections:
+            try:
+                findings += await run_native_engines(url, probe_sections, self.args.native_connections, self.helpers,
+                                                     ip=await self._resolve(url))
+            except NativeEngineError:
+                return None
+
+        digest = hashlib.md5(json.dumps(
+            sorted((item["id"], item["severity"], item["finding"]) for item in findings)
+        ).encode("utf-8")).hexdigest()
+
+        all_ok = all(item["severity"] in ("OK", "INFO") for item in findings)
+        if all_ok and digest == self._load_quick_digest(url):
+            self.cache_max_age = self.args.adaptive_ttl
+        else:
+            self.cache_max_age = 0
+        # The quick tier decides about all sections
+        self.section_max_age = {}
+        return digest
+
+    def _get_quick_digest_path(self, url: str) -> str:
+        hash_name = hashlib.md5(url.encode("utf-8")).hexdigest()
+        return os.path.join(ptmisclib.get_penterep_temp_dir(), f"{hash_name}.adaptive.json")
+
+    def _load_quick_digest(self, url: str) -> str:
+        """Returns the quick tier digest stored after the last full scan of the URL."""
+        path = self._get_quick_digest_path(url)
+        try:
+            with open(path, "r") as f:
+                digest = json.load(f).get("digest")
+            # Marks the digest as used for the LRU eviction of the cache manager
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+            return digest
+        except (OSError, ValueError):
+            return None
+
+    def _save_quick_digest(self, url: str, digest: str) -> None:
+        """Stores the quick tier digest belonging to the current full scan result."""
+        path = self._get_quick_digest_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}_{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"digest": digest, "time": time.time()}, f)
+        os.replace(temp_path, path)
+
+    async def _run_testssl(self, url, on_sections_complete=None) -> list:
         """
         Executes testssl.sh scan against the specified URL and returns parsed JSON results.
 
         Workflow:
-        - Checks if a cached JSON result file exists (based on an MD5 hash of the URL) and is fresh (not older than 30 minutes).
-        If a valid cache is found, loads and returns it without re-running testssl.sh.
-        - If no valid cache exists, verifies that `testssl` is available in PATH, otherwise aborts with an error.
-        - Removes any stale temporary cache file before running testssl.sh to avoid conflicts.
-        - Runs testssl.sh with JSON output directed to a temporary cache file.
-        - Shows live CLI output as a spinner or verbose output depending on the verbosity setting.
-        - On success, reads JSON results from the temporary file, atomically replaces the final cache file,
-        and returns the parsed data.
+        - Looks up every requested section in the cache (a full default scan is cached as one entry).
+        A section is fresh if not older than its `--section-ttl`, `--cache-ttl` otherwise, or the age accepted
+        by the `--adaptive` quick tier. The cache key covers the testssl version, the section and profile flags,
+        the URL (SNI name) and the resolved address, so a result is only reused for a matching scan.
+        If all sections are fresh, the report is assembled from the cache without re-running testssl.sh.
+        `--refresh` skips the lookup, `--no-cache` skips both lookup and storing.
+        - Otherwise verifies that `testssl` is available in PATH, otherwise aborts with an error.
+        - Runs testssl.sh limited to the missing or stale sections, with JSON output directed to a temporary file.
+        With `--split-scan`, the sections are split into groups scanned by concurrent testssl.sh processes
+        and their results are merged.
+        - While testssl.sh runs, tails the temporary file and reports every completed section
+        through `on_sections_complete`, so dependent modules can run before the scan finishes.
+        - Shows live CLI output as a spinner task or verbose output depending on the verbosity setting.
+        - On success, reads JSON results from the temporary file, atomically replaces the cache entries
+        of the scanned sections, and returns them together with the cached sections.
+        - With `--scan-timeout`, testssl.sh is killed when the budget expires. Findings of the sections
+        completed until then are returned and cached, the rest is recorded in `self.incomplete_sections`.
         - On subprocess error, reports via `end_error`.
-        - Ensures the cursor is shown again and spinner thread is stopped when done.
+        - Ensures the cursor is shown again and the spinner task is stopped when done.
 
         Args:
             url (str): Target hostname or IP address to scan.
+            on_sections_complete (callable, optional): Called as `on_sections_complete(findings, completed_sections)`
+                whenever new sections are complete while testssl.sh is running, and once up front with the
+                cached sections if only some of them were cached. Not called if the whole report was cached.
 
         Returns:
-            dict: Parsed JSON output from testssl.sh.
+            list: Parsed JSON output from testssl.sh.
 
         Raises:
             subprocess.CalledProcessError: If the testssl.sh subprocess fails.
         """
-        def load_valid_cache(path, max_age_seconds):
-            if not os.path.exists(path):
-                return None
-            try:
-                if (time.time() - os.path.getmtime(path)) > max_age_seconds:
-                    raise ValueError("Cache expired")
-                with open(path, "r") as f:
-                    return json.load(f)
-            except Exception:
-                try:
-                    os.remove(path)
-                except Exception:
-                    pass
-                return None
-
-        def spinner_func(stop_event):
+        async def spinner_func(stop_event):
             spinner = itertools.cycle(["|", "/", "-", "\\"])
             spinner_dots = itertools.cycle(["."] * 5 + [".."] * 6 + ["..."] * 7)
             if not self.args.json:
                 sys.stdout.write("\033[?25l")  # Hide cursor
                 sys.stdout.flush()
             while not stop_event.is_set():
-                ptprint(get_colored_text(f"[{next(spinner)}] ", "TITLE") + f"Testssl is running, please wait {next(spinner_dots)}", "TEXT", not self.args.json, end="\r", flush=True, clear_to_eol=True, colortext="TITLE")
-                time.sleep(0.1)
+                if self.queue_position:
+                    message = f"Waiting for a free testssl slot, queue position {self.queue_position} {next(spinner_dots)}"
+                else:
+                    message = f"Testssl is running, please wait {next(spinner_dots)}"
+                with self._lock:
+                    ptprint(get_colored_text(f"[{next(spinner)}] ", "TITLE") + message, "TEXT", not self.args.json, end="\r", flush=True, clear_to_eol=True, colortext="TITLE")
+                try:
+                    await asyncio.wait_for(stop_event.wait(), 0.1)
+                except asyncio.TimeoutError:
+                    pass
             ptprint(" ", "TEXT", not self.args.json, flush=True, clear_to_eol=True)
 
         if not shutil.which("testssl"):
@@ -127,65 +394,306 @@ class PtSSL:
         cache_dir = ptmisclib.get_penterep_temp_dir()
         os.makedirs(cache_dir, exist_ok=True)
 
+        # The resolved address is part of the key, so DNS changes are not hidden by the cache
+        ip = await self._resolve(url)
+        cache = ResultCache(cache_dir)
+        testssl_version = await asyncio.to_thread(get_testssl_version)
+        requested_sections = sorted(self.testssl_sections, key=SECTION_ORDER.index) if self.testssl_sections is not None else [FULL_SCAN]
+        cache_keys = {section: cache.make_key(testssl_version, self.profile, self._get_section_flags(section), url, ip) for section in requested_sections}
         hash_name = hashlib.md5(url.encode("utf-8")).hexdigest()
-        final_cache_file = os.path.join(cache_dir, f"{hash_name}.json")
-        #temp_cache_file = final_cache_file + ".tmp"
-        temp_cache_file = os.path.join(cache_dir, f"{hash_name}_{uuid.uuid4().hex}.tmp")
-        CACHE_EXPIRY_SECONDS = 30 * 60 # 30 mins
 
-        if self.args.verbose:
+        show_progress = self.output is None
+        verbose = self.args.verbose and show_progress
+
+        if verbose:
             ptprint(f"Testssl is running, please wait:", "TITLE", not self.args.json, flush=True, clear_to_eol=True, colortext=True, end="")
             sys.stdout.write("\033[?25l")  # Hide cursor
 
-        else:
-            stop_spinner = threading.Event()
-            spinner_thread = threading.Thread(target=spinner_func, args=(stop_spinner,))
+        elif show_progress:
+            stop_spinner = asyncio.Event()
             ptprint(f" ", "TEXT", not self.args.json, end="\n", flush=True, clear_to_eol=True)
-            spinner_thread.start()
+            spinner_task = asyncio.create_task(spinner_func(stop_spinner))
 
         try:
-            with self.acquire_testssl_lock(url, cache_dir):
-                cached_result = load_valid_cache(final_cache_file, CACHE_EXPIRY_SECONDS)
-                if cached_result is not None:
+            async with self.acquire_testssl_lock(url, cache_dir):
+                cached_sections = {}
+                if not (self.args.no_cache or self.args.refresh):
+                    cached_sections = await asyncio.to_thread(self._load_cached_sections, cache, cache_keys)
+                cached_result = merge_results([cached_sections[section] for section in requested_sections if section in cached_sections])
+                scan_sections = [section for section in requested_sections if section not in cached_sections]
+                if not scan_sections:
                     return cached_result
 
-                if os.path.exists(temp_cache_file):
-                    try:
-                        os.remove(temp_cache_file)
-                    except Exception:
-                        pass
-
-                subprocess.run(
-                    ["testssl", "--jsonfile", temp_cache_file, "--logfile", "/dev/stdout", url],
-                    check=True,
-                    bufsize=1,
-                    universal_newlines=True,
-                    stdout=sys.stdout if self.args.verbose else subprocess.DEVNULL,
-                    stderr=sys.stderr if self.args.verbose else subprocess.DEVNULL
-                )
+                if cached_sections and on_sections_complete:
+                    # Modules of cached sections run right away, the scanned sections are added as they complete
+                    report_sections = on_sections_complete
+                    report_sections(cached_result, set(cached_sections))
+                    on_sections_complete = lambda findings, completed: report_sections(
+                        merge_results([cached_result, findings]), completed | set(cached_sections))
+
+                testssl_sections = None if scan_sections == [FULL_SCAN] else set(scan_sections)
+                slots = HostSlots(cache_dir, self.args.testssl_slots)
+                if self.args.split_scan and testssl_sections:
+                    # Never more testssl processes than slots a single run may hold
+                    section_groups = split_sections(testssl_sections, max_groups=slots.slots)
+                else:
+                    section_groups = [testssl_sections]
 
-                with open(temp_cache_file, "r") as f:
-                    result = json.load(f)
+                scans = []
+                for sections in section_groups:
+                    scan_file = os.path.join(cache_dir, f"{hash_name}_{uuid.uuid4().hex}.tmp")
+                    scans.append((sections, scan_file))
 
-                os.replace(temp_cache_file, final_cache_file)
+                on_wait = lambda position: self._report_queue_position(position, verbose)
+                try:
+                    async with slots.acquire(len(scans), on_wait=on_wait):
+                        started = time.monotonic()
+                        result, missing_sections = await self._execute_testssl(url, scans, verbose, on_sections_complete, ip=ip)
+                        runtime = time.monotonic() - started
+                finally:
+                    for _, scan_file in scans:
+                        if os.path.exists(scan_file):
+                            os.remove(scan_file)
+
+                if missing_sections:
+                    # Only completed sections are cached, a partial full scan is not
+                    self.incomplete_sections = missing_sections
+                    self.helpers.incomplete_sections = missing_sections
+                    ptprint(f"Testssl did not finish within {self.args.scan_timeout} s, results are incomplete", "WARNING", not self.args.json, clear_to_eol=True)
+                    scan_sections = [section for section in scan_sections if section not in missing_sections and section != FULL_SCAN]
+                else:
+                    if testssl_sections == self.profile_sections:
+                        # Only runs of all profile sections are comparable (no -ts subset, cached or native sections)
+                        await asyncio.to_thread(_get_profile_runtimes().record, self.profile, runtime)
+                        await asyncio.to_thread(_get_duration_history().record, url, self.profile, runtime)
 
-            return result
+                if not self.args.no_cache:
+                    await asyncio.to_thread(self._store_sections, cache, {section: cache_keys[section] for section in scan_sections}, result)
+
+            if not self.args.no_cache:
+                # After releasing the target lock, so a collection does not hold up other scans of the target
+                await asyncio.to_thread(_collect_garbage, self.args)
+
+            return merge_results([cached_result, result])
 
         except subprocess.CalledProcessError as e:
+            await self._record_failure(url, f"testssl.sh exited with code {e.returncode}")
             self.ptjsonlib.end_error("testssl.sh raised exception:", details=e, condition=self.args.json)
 
         finally:
-            sys.stdout.write("\033[?25h")  # Show cursor
-            if not self.args.verbose:
+            if show_progress:
+                sys.stdout.write("\033[?25h")  # Show cursor
+            if show_progress and not verbose:
                 stop_spinner.set()
-                spinner_thread.join()
+                await spinner_task
+
+    def _get_profile_sections(self):
+        """Returns the testssl sections a scan of the whole profile runs (None for a full default scan)."""
+        module_sections = self._get_module_sections(PROFILES[self.profile]["tests"] or _get_all_available_modules())
+        return self._get_testssl_sections(module_sections)
 
-    @contextmanager
-    def acquire_testssl_lock(self, url: str, cache_dir: str):
+    def _get_section_flags(self, section: str) -> list:
+        """Returns the testssl flags producing a cached section (profile flags included)."""
+        flags = build_testssl_flags([section]) if section != FULL_SCAN else []
+        return [*flags, *PROFILES[self.profile]["flags"]]
+
+    def _load_cached_sections(self, cache: ResultCache, cache_keys: dict) -> dict:
+        """
+        Returns the fresh cached sections.
+
+        Args:
+            cache (ResultCache): Result cache.
+            cache_keys (dict): Section -> cache key.
+
+        Returns:
+            dict: Section -> cached findings, stale and missing sections left out.
+        """
+        cached_sections = {}
+        for section, key in cache_keys.items():
+            findings = cache.load(key, self.section_max_age.get(section, self.cache_max_age))
+            if findings is not None:
+                cached_sections[section] = findings
+        return cached_sections
+
+    def _store_sections(self, cache: ResultCache, cache_keys: dict, result: list) -> None:
         """
-        Context manager for exclusive testssl execution per domain.
+        Caches every scanned section on its own.
 
-        If another process is already testing the same URL, this will block
+        Args:
+            cache (ResultCache): Result cache.
+            cache_keys (dict): Section -> cache key of the sections to store.
+            result (list): Findings of the scanned sections.
+        """
+        for section, key in cache_keys.items():
+            cache.store(key, result if section == FULL_SCAN else filter_sections(result, [section]))
+
+    def _report_queue_position(self, position: int, verbose: bool) -> None:
+        """
+        Reports the position in the host-wide queue of testssl runs.
+
+        The position is shown by the spinner (or printed in verbose mode). With `--json`,
+        stdout carries only the results (one document, or one line per target in batch mode),
+        so every change is written to stderr as a JSON line
+        `{"target", "status": "queued" | "running", "queuePosition"}` (documented in the help);
+        position 0 with status running means a testssl slot has been acquired.
+        """
+        waited = self.queue_position != 0
+        self.queue_position = position
+        if self.args.json and (position or waited):
+            status = {"target": self.args.url, "status": "queued" if position else "running", "queuePosition": position}
+            with printlock:
+                # The real stderr, not the per-target output buffer of batch mode
+                sys.__stderr__.write(json.dumps(status) + "\n")
+                sys.__stderr__.flush()
+        elif position and verbose:
+            ptprint(f"Waiting for a free testssl slot, queue position {position}", "TEXT", not self.args.json, flush=True, clear_to_eol=True)
+
+    async def check_circuit(self, url: str) -> str:
+        """Returns why the target is skipped because of earlier failures, or None if it may be scanned."""
+        return await asyncio.to_thread(_get_circuit_breaker().check, urlparse(url).hostname, await self._resolve(url))
+
+    async def _record_failure(self, url: str, reason: str) -> None:
+        """Opens the circuit of the target (and possibly its subnet) after a failed scan."""
+        await asyncio.to_thread(_get_circuit_breaker().record_failure, urlparse(url).hostname, await self._resolve(url), reason)
+
+    async def _record_success(self, url: str) -> None:
+        """Closes the circuit of the target after a completed scan."""
+        await asyncio.to_thread(_get_circuit_breaker().record_success, urlparse(url).hostname, await self._resolve(url))
+
+    async def _resolve(self, url: str) -> str:
+        """Returns the cached address of the URL host, or None if it cannot be resolved."""
+        return await asyncio.to_thread(self.dns_cache.resolve, urlparse(url).hostname)
+
+    async def _execute_testssl(self, url: str, scans: list, verbose: bool, on_sections_complete=None, ip: str = None) -> list:
+        """
+        Runs one testssl.sh process per scan concurrently and merges their findings.
+
+        Args:
+            url (str): Target URL.
+            scans (list): (sections, json_file) pairs; sections None means a full default scan.
+            verbose (bool): Show live testssl.sh output.
+            on_sections_complete (callable, optional): See `_run_testssl`.
+            ip (str, optional): Address testssl connects to instead of resolving the host itself.
+
+        Returns:
+            tuple: (merged findings, set of requested sections left incomplete because
+                   `--scan-timeout` expired).
+
+        Raises:
+            subprocess.CalledProcessError: If any testssl.sh process fails.
+            asyncio.CancelledError: If the scan is cancelled; the testssl.sh processes are killed.
+        """
+        deadline = time.monotonic() + self.args.scan_timeout if self.args.scan_timeout else None
+
+        address_flags = []
+        if ip:
+            address_flags = ["--ip", ip, "-6"] if ":" in ip else ["--ip", ip]
+
+        jobs = []
+        try:
+            for sections, json_file in scans:
+                flags = build_testssl_flags(sections) if sections is not None else []
+                command = ["testssl", *flags, *PROFILES[self.profile]["flags"], *address_flags, "--jsonfile", json_file, "--logfile", "/dev/stdout", url]
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=self.thread_local_stdout.real_stdout if verbose else subprocess.DEVNULL,
+                    stderr=self.thread_local_stdout.real_stdout if verbose else subprocess.DEVNULL,
+                    start_new_session=True  # own process group, killed as a whole on timeout
+                )
+                jobs.append({
+                    "command": command,
+                    "process": process,
+                    "sections": set(sections) if sections is not None else set(SECTION_ORDER),
+                    "reader": TestsslJsonReader(json_file),
+                    "tracker": SectionTracker(),
+                })
+
+            running = True
+            while running:
+                await asyncio.sleep(self.STREAM_POLL_INTERVAL)
+                if deadline is not None and time.monotonic() > deadline:
+                    return await self._salvage_testssl(jobs)
+                running = False
+                newly_completed = set()
+                for job in jobs:
+                    finished = job["process"].returncode is not None
+                    newly_completed |= job["tracker"].feed(job["reader"].read())
+                    if finished:
+                        newly_completed |= job["tracker"].finish()
+                    else:
+                        running = True
+
+                if running and newly_completed and on_sections_complete:
+                    completed = set()
+                    for job in jobs:
+                        completed |= job["tracker"].completed & job["sections"]
+                    on_sections_complete(merge_results([job["reader"].items for job in jobs]), completed)
+        except asyncio.CancelledError:
+            await self._kill_testssl(jobs)
+            raise
+
+        for job in jobs:
+            if job["process"].returncode != 0:
+                raise subprocess.CalledProcessError(job["process"].returncode, job["command"])
+
+        results = []
+        for job in jobs:
+            with open(job["reader"].path, "r") as f:
+                results.append(json.load(f))
+        return merge_results(results), set()
+
+    async def _kill_testssl(self, jobs: list) -> None:
+        """
+        Kills running testssl.sh processes.
+
+        Every process runs in its own process group, which is terminated as a whole
+        (SIGTERM, then SIGKILL after `KILL_GRACE_PERIOD`) so no openssl children survive.
+        The group is killed even if testssl itself already exited, as its children may not have.
+
+        Args:
+            jobs (list): Scans as built by `_execute_testssl`.
+        """
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            for job in jobs:
+                try:
+                    os.killpg(job["process"].pid, sig)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            for job in jobs:
+                try:
+                    await asyncio.wait_for(job["process"].wait(), self.KILL_GRACE_PERIOD)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _salvage_testssl(self, jobs: list) -> tuple:
+        """
+        Kills timed out testssl.sh processes and keeps the findings of completed sections.
+
+        Args:
+            jobs (list): Running scans as built by `_execute_testssl`.
+
+        Returns:
+            tuple: (findings of completed sections, set of incomplete requested sections)
+        """
+        await self._kill_testssl(jobs)
+
+        results = []
+        missing_sections = set()
+        for job in jobs:
+            job["tracker"].feed(job["reader"].read())
+            if job["process"].returncode == 0:
+                job["tracker"].finish()
+            completed = job["tracker"].completed & job["sections"]
+            missing_sections |= job["sections"] - completed
+            results.append(filter_sections(job["reader"].items, completed))
+        return merge_results(results), missing_sections
+
+    @asynccontextmanager
+    async def acquire_testssl_lock(self, url: str, cache_dir: str):
+        """
+        Async context manager for exclusive testssl execution per domain.
+
+        If another process (or task) is already testing the same URL, this will wait
         until the lock is released. Lock is automatically released when the
         context exits or if the process is terminated normally.
 
@@ -197,15 +705,32 @@ class PtSSL:
         hash_name = hashlib.md5(url.encode("utf-8")).hexdigest()
         lock_file_path = os.path.join(cache_dir, f"{hash_name}.lock")
 
-        with open(lock_file_path, "w") as lock_file:
-            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        while True:
+            lock_file = open(lock_file_path, "w")
             try:
-                yield
-            finally:
-                # lock automatically released when file is closed
-                pass
-
-    def run_single_module(self, module_name: str) -> None:
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(self.STREAM_POLL_INTERVAL)
+                # The cache manager removes unused lock files, a lock of a removed file excludes nobody
+                try:
+                    current = os.path.samestat(os.fstat(lock_file.fileno()), os.stat(lock_file_path))
+                except FileNotFoundError:
+                    current = False
+            except BaseException:
+                lock_file.close()
+                raise
+            if current:
+                break
+            lock_file.close()
+
+        with lock_file:
+            # lock automatically released when file is closed
+            yield
+
+    def run_single_module(self, module_name: str, testssl_result: list = None) -> None:
         """
         Safely loads and executes a specified module's `run()` function.
 
@@ -218,10 +743,10 @@ class PtSSL:
 
         Args:
             module_name (str): The name of the module (without `.py` extension) to execute.
+            testssl_result (list, optional): testssl findings to analyse. Defaults to `self.testssl_result`.
         """
         try:
-            with self._lock:
-                module = _import_module_from_path(module_name)
+            module = _import_module_from_path(module_name)
 
             if hasattr(module, "run") and callable(module.run):
                 buffer = StringIO()
@@ -231,7 +756,7 @@ class PtSSL:
                         args=self.args,
                         ptjsonlib=self.ptjsonlib,
                         helpers=self.helpers,
-                        testssl_result=self.testssl_result
+                        testssl_result=testssl_result if testssl_result is not None else self.testssl_result
                     )
 
                 except Exception as e:
@@ -240,9 +765,10 @@ class PtSSL:
                 else:
                     error = None
                 finally:
-                    self.thread_local_stdout.clear_thread_buffer()
+                    self.thread_local_stdout.set_thread_buffer(self.output)
                     with self._lock:
-                        ptprint(buffer.getvalue(), "TEXT", not self.args.json, end="\n")
+                        ptprint(buffer.getvalue(), "TEXT", not self.args.json, end="\n", clear_to_eol=True)
+                    self.thread_local_stdout.clear_thread_buffer()
             else:
                 ptprint(f"Module '{module_name}' does not have 'run' function", "WARNING", not self.args.json)
 
@@ -252,6 +778,281 @@ class PtSSL:
             ptprint(f"Error running module '{module_name}': {e}", "ERROR", not self.args.json)
 
 
+class PtSSLBatch:
+    """
+    Scans a list of targets from one ptssl process.
+
+    Every target is scanned by its own `PtSSL` instance (sharing the testssl
+    cache and per-URL locks) as a task of one event loop, at most `--parallel` at once.
+    Targets are resolved up front and grouped by IP:port, so virtual hosts behind
+    one server are scanned at most `--per-ip` at once and `--ip-delay` apart.
+    The output of each target is collected and printed as a whole once its
+    module analysis has finished.
+
+    With `--dedupe`, targets served by the same TLS endpoint (IP, port, certificate
+    and negotiated parameters) are scanned once; the result is copied to the other
+    members with the SNI dependent tests marked as not verified for their names.
+
+    With `--journal` (or `--resume`), progress is appended to a checkpoint journal;
+    `--resume` skips the targets the journal records as finished.
+
+    Targets are started longest expected testssl runtime first (from the duration
+    history of earlier scans), so slow hosts do not finish last.
+    """
+    DEFAULT_DURATION = 300  # seconds expected from a target without history if the profile has no median either
+
+    def __init__(self, args, targets: list = None, result_file=None):
+        """
+        Args:
+            args (argparse.Namespace): Parsed command line arguments.
+            targets (list, optional): Targets to scan. Defaults to the targets listed in `--file`.
+            result_file (file, optional): File receiving one JSON result line per target instead of stdout.
+        """
+        self.args = args
+        self.targets = targets if targets is not None else read_targets(args.file)
+        self.result_file = result_file
+        self.finished = 0  # progress of printed targets
+        self.total = 0
+        self.thread_local_stdout = _activate_thread_local_stdout()
+        self.same_endpoint = {}  # scanned target -> targets sharing its TLS endpoint
+        self.dns_cache = DnsCache(args.dns_ttl)
+        self.sni_dependent_tests = self._get_sni_dependent_tests()
+
+        journal_path = args.resume or args.journal
+        self.completed = read_completed(args.resume) if args.resume and os.path.exists(args.resume) else set()
+        self.journal = Journal(journal_path) if journal_path else None
+
+    def run(self) -> None:
+        """Main method"""
+        if self.args.engine == "testssl" and not shutil.which("testssl"):
+            ptjsonlib.PtJsonLib().end_error("testssl.sh is not installed or not found in PATH. Please install it first via `sudo apt install testssl.sh`.", self.args.json)
+
+        targets = [target for target in self.targets if target not in self.completed]
+        if len(targets) < len(self.targets):
+            ptprint(f"Skipping {len(self.targets) - len(targets)} targets finished according to {self.args.resume}", "INFO", not self.args.json)
+        if self.journal:
+            for target in targets:
+                self.journal.write("queued", target)
+        self.total = len(targets)
+
+        if self.args.dedupe:
+            fingerprint_of = lambda target: get_endpoint_fingerprint(target, resolve=self.dns_cache.resolve)
+            clusters = cluster_targets(targets, fingerprint_of, self.args.parallel)
+            self.same_endpoint = {cluster[0]: cluster[1:] for cluster in clusters}
+            targets = list(self.same_endpoint)
+
+        targets = self.order_by_expected_duration(targets)
+
+        try:
+            BatchRunner(
+                targets, self.args.parallel, self.scan_target, self.print_result,
+                group_of=self.get_server_address, per_group=self.args.per_ip, group_delay=self.args.ip_delay
+            ).run()
+        finally:
+            if self.journal:
+                self.journal.close()
+
+    def order_by_expected_duration(self, targets: list) -> list:
+        """Returns the targets sorted by their predicted testssl runtime, longest first."""
+        profile = self.args.profile or DEFAULT_PROFILE
+        default = _get_profile_runtimes().median(profile) or self.DEFAULT_DURATION
+        history = _get_duration_history()
+        return sorted(targets, key=lambda target: history.predict(_normalize_url(target), profile, default), reverse=True)
+
+    def get_server_address(self, target: str) -> str:
+        """Returns "IP:port" the target resolves to, or the target itself if it cannot be resolved."""
+        parsed = urlparse(target)
+        try:
+            port = parsed.port or 443
+        except ValueError:
+            return target
+        address = self.dns_cache.resolve(parsed.hostname) if parsed.hostname else None
+        return f"{address}:{port}" if address else target
+
+    async def scan_target(self, target: str) -> dict:
+        """
+        Scans a single target as a task of the batch event loop and captures its output.
+
+        Args:
+            target (str): Target URL as given in the target list.
+
+        Returns:
+            dict: {"status": "finished" | "error" | "skipped", "output": captured output}
+        """
+        if self.journal:
+            self.journal.write("started", target)
+        buffer = StringIO()
+        status = "finished"
+        self.thread_local_stdout.set_thread_buffer(buffer)
+        try:
+            if not target.startswith("https://"):
+                raise ValueError("The provided URL uses plain HTTP, which is not secured by SSL/TLS.")
+            target_args = argparse.Namespace(**{**vars(self.args), "url": _normalize_url(target)})
+            scan = PtSSL(target_args, output=buffer, dns_cache=self.dns_cache)
+            reason = None if self.args.ignore_circuit else await scan.check_circuit(target_args.url)
+            if reason:
+                # Skipped immediately, no worker slot is spent on a target known to be down
+                status = "skipped"
+                if self.args.json:
+                    ptprint(json.dumps({"status": "skipped", "message": f"Circuit open: {reason}"}), "", True)
+                else:
+                    ptprint(f"Skipped, circuit open: {reason}", "WARNING", True)
+            else:
+                await scan.run_async()
+        except SystemExit:
+            # end_error() already printed the error into the buffer
+            status = "error"
+        except Exception as e:
+            status = "error"
+            if self.args.json:
+                ptprint(json.dumps({"status": "error", "message": str(e)}), "", True)
+            else:
+                ptprint(e, "ERROR", True)
+        finally:
+            self.thread_local_stdout.clear_thread_buffer()
+        return {"status": status, "output": buffer.getvalue()}
+
+    def _get_sni_dependent_tests(self) -> list:
+        """Returns the selected tests whose results depend on the host name (`__SNI_DEPENDENT__`)."""
+        tests = []
+        for module_name in self.args.tests or _get_all_available_modules():
+            try:
+                module = _import_module_from_path(module_name)
+            except Exception:
+                continue
+            if getattr(module, "__SNI_DEPENDENT__", False):
+                tests.append(module_name.upper())
+        return tests
+
+    def print_result(self, target: str, result: dict) -> None:
+        """Prints the captured output of a finished target and copies it to targets sharing its endpoint."""
+        self._print_target_result(target, result)
+        for member in self.same_endpoint.get(target, []):
+            self._print_target_result(member, result, same_endpoint_as=target)
+
+    def _print_target_result(self, target: str, result: dict, same_endpoint_as: str = None) -> None:
+        if self.journal:
+            digest = hashlib.sha256(result["output"].encode("utf-8")).hexdigest()
+            self.journal.write("finished" if result["status"] == "finished" else "failed", target, digest=digest)
+
+        if self.args.json:
+            try:
+                target_result = json.loads(result["output"])
+            except ValueError:
+                target_result = result["output"]
+            line = {"target": target, "status": result["status"], "result": target_result}
+            if same_endpoint_as:
+                line.update({"sameEndpointAs": same_endpoint_as, "unverifiedTests": self.sni_dependent_tests})
+            if self.result_file:
+                self.result_file.write(json.dumps(line) + "\n")
+            else:
+                ptprint(json.dumps(line), "", True)
+        else:
+            self.finished += 1
+            ptprint(f"[{self.finished}/{self.total}] {target}", "TITLE", True, colortext=True)
+            if same_endpoint_as:
+                ptprint(f"Same TLS endpoint as {same_endpoint_as}, results copied", "INFO", True, indent=4)
+                if self.sni_dependent_tests:
+                    ptprint(f"Not verified for this name: {', '.join(self.sni_dependent_tests)}", "WARNING", True, indent=4)
+            ptprint(result["output"], "TEXT", True, end="\n")
+
+
+class PtSSLWorker:
+    """
+    Scans target files leased from a spool directory shared by any number of workers.
+
+    Every leased `<name>.target` file is scanned as a batch (JSON output forced)
+    and its result lines are written to `<name>.result` next to it. The worker
+    runs until interrupted.
+    """
+
+    def __init__(self, args):
+        self.args = argparse.Namespace(**{**vars(args), "json": True})
+        self.spool = Spool(args.worker, lease_time=args.lease_time)
+
+    def run(self) -> None:
+        """Main method"""
+        if not os.path.isdir(self.args.worker):
+            ptjsonlib.PtJsonLib().end_error(f"Spool directory {self.args.worker} does not exist.", condition=True)
+
+        while True:
+            lease = self.spool.lease()
+            if lease is None:
+                time.sleep(self.spool.POLL_INTERVAL)
+                continue
+            with lease:
+                self.process(lease)
+
+    def process(self, lease) -> None:
+        """Scans the targets of one leased file and completes the lease with their results."""
+        targets = read_targets(lease.path)
+        result_path = os.path.join(self.args.worker, f"{lease.name}.{uuid.uuid4().hex}.tmp")
+        with open(result_path, "w") as result_file:
+            PtSSLBatch(self.args, targets=targets, result_file=result_file).run()
+        if lease.complete(result_path):
+            ptprint(json.dumps({"file": lease.name, "status": "finished", "targets": len(targets)}), "", True)
+        else:
+            ptprint(json.dumps({"file": lease.name, "status": "lease expired", "targets": len(targets)}), "", True)
+
+
+def _activate_thread_local_stdout() -> ThreadLocalStdout:
+    """Activates the ThreadLocalStdout stdout proxy once and returns it."""
+    if not isinstance(sys.stdout, ThreadLocalStdout):
+        ThreadLocalStdout(sys.stdout).activate()
+    return sys.stdout
+
+def _get_profile_runtimes() -> ProfileRuntimes:
+    """Returns the runtime store of the scan profiles shared by all ptssl processes."""
+    return ProfileRuntimes(os.path.join(ptmisclib.get_penterep_temp_dir(), "profile_runtimes.json"))
+
+def _get_circuit_breaker() -> CircuitBreaker:
+    """Returns the circuit breaker state of failing hosts shared by all ptssl processes."""
+    return CircuitBreaker(os.path.join(ptmisclib.get_penterep_temp_dir(), "circuits.json"))
+
+def _get_duration_history() -> DurationHistory:
+    """Returns the runtime history of individual targets shared by all ptssl processes."""
+    return DurationHistory(os.path.join(ptmisclib.get_penterep_temp_dir(), "target_runtimes.jsonl"))
+
+def _collect_garbage(args, force: bool = False) -> dict:
+    """
+    Bounds the cache and removes files left behind by crashed runs and expired circuits.
+
+    Args:
+        args (argparse.Namespace): Arguments with the cache limits.
+        force (bool): Collect even if another process collected recently.
+
+    Returns:
+        dict: Statistics of the collection, or None if it was skipped.
+    """
+    manager = CacheManager(ptmisclib.get_penterep_temp_dir(), args.cache_max_size << 20, args.cache_max_entries)
+    stats = manager.collect() if force else manager.maybe_collect()
+    if stats is not None:
+        stats["circuits"] = _get_circuit_breaker().purge_expired()
+    return stats
+
+def _parse_time(value: str) -> float:
+    """Parses a `ptssl query` time: relative to now (`30m`, `12h`, `7d`) or an ISO date / date and time."""
+    units = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected <count>m, <count>h, <count>d or an ISO date (YYYY-MM-DD[ HH:MM])")
+
+def _parse_section_ttl(value: str) -> tuple:
+    """Parses a `--section-ttl` value `<section>=<seconds>`."""
+    section, _, seconds = value.partition("=")
+    if section not in SECTION_ORDER or not seconds.isdigit():
+        raise argparse.ArgumentTypeError(f"expected <section>=<seconds> with section one of {', '.join(SECTION_ORDER)}")
+    return section, int(seconds)
+
+def _normalize_url(url: str) -> str:
+    """Strips path, parameters, query and fragment from the URL."""
+    return urlunparse(urlparse(url)._replace(path='', params='', query='', fragment=''))
+
+_modules = {}
+_modules_lock = threading.Lock()
 
 def _import_module_from_path(module_name: str) -> ModuleType:
     """
@@ -259,6 +1060,8 @@ def _import_module_from_path(module_name: str) -> ModuleType:
 
     This method uses `importlib` to load a module from a specific file location.
     The module is then registered in `sys.modules` under the provided name.
+    Each module is executed once per process, later calls (also from the
+    concurrent scans of a batch) return the same module object.
 
     Args:
         module_name (str): Name under which to register the module.
@@ -269,15 +1072,19 @@ def _import_module_from_path(module_name: str) -> ModuleType:
     Raises:
         ImportError: If the module cannot be found or loaded.
     """
-    module_path = os.path.join(os.path.dirname(__file__), "modules", f"{module_name}.py")
-
-    spec = importlib.util.spec_from_file_location(module_name, module_path)
-    if spec is None:
-        raise ImportError(f"Cannot find spec for {module_name} at {module_path}")
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[module_name] = module
-    spec.loader.exec_module(module)
-    return module
+    with _modules_lock:
+        if module_name in _modules:
+            return _modules[module_name]
+        module_path = os.path.join(os.path.dirname(__file__), "modules", f"{module_name}.py")
+
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        if spec is None:
+            raise ImportError(f"Cannot find spec for {module_name} at {module_path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        _modules[module_name] = module
+        return module
 
 def _get_all_available_modules() -> list:
     """
@@ -327,9 +1134,41 @@ def get_help():
         {"usage": ["ptssl <options>"]},
         {"usage_example": [
             "ptssl -u https://www.example.com",
+            "ptssl -f targets.txt --parallel 8",
+            "ptssl cache gc",
+            "ptssl query --store results.db --id TLS1 --finding 'offered*' --since 7d",
         ]},
         {"options": [
             ["-u",  "--url",                    "<url>",            "Connect to URL"],
+            ["-f",  "--file",                   "<file>",           "Scan URLs listed in file, one per line (\"-\" for stdin)"],
+            ["-w",  "--worker",                 "<directory>",      "Scan target files leased from spool directory (one URL per line in <name>.target)"],
+            ["",    "--lease-time",             "<seconds>",        "Set lease expiry of --worker, renewed while scanning (default 300)"],
+            ["",    "--parallel",               "<count>",          "Set count of parallel testssl scans for --file (default 4)"],
+            ["",    "--per-ip",                 "<count>",          "Set count of parallel scans of one IP:port for --file (default 2, 0 = unlimited)"],
+            ["",    "--ip-delay",               "<seconds>",        "Set minimum delay between scans of one IP:port for --file (default 0)"],
+            ["",    "--dedupe",                 "",                 "Scan targets sharing one TLS endpoint only once for --file"],
+            ["",    "--profile",                "<profile>",        "Use scan profile quick, standard, full (default) or vuln-only"],
+            ["",    "--time-budget",            "<seconds>",        "Use the most thorough profile whose median runtime fits (also sets --scan-timeout)"],
+            ["",    "--journal",                "<file>",           "Append progress of --file scan to checkpoint journal"],
+            ["",    "--resume",                 "<file>",           "Skip targets finished according to journal and continue it"],
+            ["",    "--ignore-circuit",         "",                 "Scan targets even if earlier failures opened their circuit"],
+            ["",    "--split-scan",             "",                 "Split each scan into concurrent testssl processes"],
+            ["",    "--scan-timeout",           "<seconds>",        "Kill testssl after given time and evaluate partial results"],
+            ["-e",  "--engine",                 "<engine>",         "Use testssl (default) or native engines where available"],
+            ["",    "--native-connections",     "<count>",          "Set max concurrent connections per host for native engines (default 6)"],
+            ["",    "--dns-ttl",                "<seconds>",        "Set how long resolved addresses are cached if their DNS TTL is unknown (default 300)"],
+            ["",    "--testssl-slots",          "<count>",          "Set max testssl runs on this machine across all ptssl processes (default CPU count)"],
+            ["",    "",                         "",                 "With -j, waiting for a slot is reported on stderr as JSON lines:"],
+            ["",    "",                         "",                 "{\"target\", \"status\": \"queued\" | \"running\", \"queuePosition\"}"],
+            ["",    "--store",                  "<file>",           "Add findings to SQLite result store (see ptssl query --help)"],
+            ["",    "--cache-ttl",              "<seconds>",        "Set max age of reused cached testssl results (default 1800)"],
+            ["",    "--section-ttl",            "<section=s>",      "Set max age of cached testssl sections, e.g. server_defaults=86400"],
+            ["",    "--refresh",                "",                 "Ignore cached testssl results, but cache the new ones"],
+            ["",    "--no-cache",               "",                 "Neither reuse nor store cached testssl results"],
+            ["",    "--cache-max-size",         "<MB>",             "Set max size of the testssl cache, least recently used results are evicted (default 1024)"],
+            ["",    "--cache-max-entries",      "<count>",          "Set max count of cached testssl sections (default 100000)"],
+            ["",    "--adaptive",               "",                 "Quick native check first, reuse cached full scan while nothing changed"],
+            ["",    "--adaptive-ttl",           "<seconds>",        "Set max age of full scan reused by --adaptive (default 86400)"],
             ["-ts", "--tests",                  "<test>",     "Specify one or more tests to perform:"],
             *_get_available_modules_help(),
             ["", "", "", ""],
@@ -343,7 +1182,34 @@ def get_help():
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(add_help="False", description=f"{SCRIPTNAME} <options>")
-    parser.add_argument("-u",  "--url",            type=str, required=True)
+    parser.add_argument("-u",  "--url",            type=str)
+    parser.add_argument("-f",  "--file",           type=str)
+    parser.add_argument("-w",  "--worker",         type=str)
+    parser.add_argument("--lease-time",            type=int, default=300)
+    parser.add_argument("--parallel",              type=int, default=4)
+    parser.add_argument("--per-ip",                type=int, default=2)
+    parser.add_argument("--ip-delay",              type=float, default=0)
+    parser.add_argument("--dedupe",                action="store_true")
+    parser.add_argument("--profile",               type=str, choices=list(PROFILES), default=None)
+    parser.add_argument("--time-budget",           type=int, default=None)
+    parser.add_argument("--journal",               type=str, default=None)
+    parser.add_argument("--resume",                type=str, default=None)
+    parser.add_argument("--ignore-circuit",        action="store_true")
+    parser.add_argument("--split-scan",            action="store_true")
+    parser.add_argument("--scan-timeout",          type=int, default=None)
+    parser.add_argument("-e",  "--engine",         type=str, choices=["testssl", "native"], default="testssl")
+    parser.add_argument("--native-connections",    type=int, default=6)
+    parser.add_argument("--dns-ttl",               type=int, default=300)
+    parser.add_argument("--testssl-slots",         type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--store",                 type=str, default=None)
+    parser.add_argument("--cache-ttl",             type=int, default=PtSSL.CACHE_EXPIRY_SECONDS)
+    parser.add_argument("--section-ttl",           type=_parse_section_ttl, nargs="+")
+    parser.add_argument("--refresh",               action="store_true")
+    parser.add_argument("--no-cache",              action="store_true")
+    parser.add_argument("--cache-max-size",        type=int, default=1024)
+    parser.add_argument("--cache-max-entries",     type=int, default=100000)
+    parser.add_argument("--adaptive",              action="store_true")
+    parser.add_argument("--adaptive-ttl",          type=int, default=24 * 60 * 60)
     parser.add_argument("-ts", "--tests",          type=lambda s: s.lower(), nargs="+")
     parser.add_argument("-t",  "--threads",        type=int, default=10)
     parser.add_argument("-vv", "--verbose",        action="store_true")
@@ -360,21 +1226,90 @@ def parse_args() -> argparse.Namespace:
 
     args = parser.parse_args()
 
-    if not args.url.startswith("https://"):
-        ptjsonlib.PtJsonLib().end_error("The provided URL uses plain HTTP, which is not secured by SSL/TLS.",
-        details="This tool is designed to test SSL/TLS configurations on HTTPS (SSL-secured) endpoints only.",
-        condition=args.json)
+    if sum(map(bool, (args.url, args.file, args.worker))) != 1:
+        ptjsonlib.PtJsonLib().end_error("Specify either a URL (-u), a file with URLs (-f) or a spool directory (-w).", condition=args.json)
+
+    if args.url:
+        if not args.url.startswith("https://"):
+            ptjsonlib.PtJsonLib().end_error("The provided URL uses plain HTTP, which is not secured by SSL/TLS.",
+            details="This tool is designed to test SSL/TLS configurations on HTTPS (SSL-secured) endpoints only.",
+            condition=args.json)
 
-    args.url = urlunparse(urlparse(args.url)._replace(path='', params='', query='', fragment=''))
+        args.url = _normalize_url(args.url)
+
+    if args.resume and args.journal and os.path.abspath(args.resume) != os.path.abspath(args.journal):
+        ptjsonlib.PtJsonLib().end_error("--resume continues the given journal, do not combine it with another --journal.", condition=args.json)
+
+    if args.testssl_slots < 1:
+        ptjsonlib.PtJsonLib().end_error("--testssl-slots must be at least 1.", condition=args.json)
+
+    if args.time_budget:
+        if not args.profile:
+            args.profile = _get_profile_runtimes().select(args.time_budget)
+        if not args.scan_timeout:
+            args.scan_timeout = args.time_budget
 
     print_banner(SCRIPTNAME, __version__, args.json, 0)
     return args
 
+def cache_main(argv: list) -> None:
+    """Maintains the testssl cache: `ptssl cache gc [--cache-max-size <MB>] [--cache-max-entries <count>] [-j]`."""
+    parser = argparse.ArgumentParser(prog=f"{SCRIPTNAME} cache")
+    parser.add_argument("action",                  choices=["gc"])
+    parser.add_argument("--cache-max-size",        type=int, default=1024)
+    parser.add_argument("--cache-max-entries",     type=int, default=100000)
+    parser.add_argument("-j",  "--json",           action="store_true")
+    args = parser.parse_args(argv)
+
+    stats = _collect_garbage(args, force=True)
+    if args.json:
+        ptprint(json.dumps(stats), "", True)
+    else:
+        ptprint(f"Evicted {stats['evicted']} cached results ({stats['freed'] / (1 << 20):.1f} MB), removed {stats['stale']} stale files "
+                f"and {stats['circuits']} expired circuits; {stats['entries']} cached results ({stats['bytes'] / (1 << 20):.1f} MB) kept", "INFO", True)
+
+def query_main(argv: list) -> None:
+    """Searches the findings kept by `--store`: `ptssl query --store <file> [conditions] [-j]`."""
+    parser = argparse.ArgumentParser(prog=f"{SCRIPTNAME} query", description="Patterns accept shell-style wildcards (*, ?).")
+    parser.add_argument("--store",                 type=str, required=True, help="SQLite result store")
+    parser.add_argument("--host",                  type=str, help="host name pattern, e.g. '*.example.com'")
+    parser.add_argument("--id",                    type=str, help="testssl finding id pattern, e.g. TLS1")
+    parser.add_argument("--severity",              type=str, nargs="+", help="accepted severities, e.g. HIGH CRITICAL")
+    parser.add_argument("--finding",               type=str, help="finding text pattern, e.g. 'offered*'")
+    parser.add_argument("--since",                 type=_parse_time, help="earliest scan time: 7d, 12h, 30m or ISO date")
+    parser.add_argument("--until",                 type=_parse_time, help="latest scan time: 7d, 12h, 30m or ISO date")
+    parser.add_argument("--limit",                 type=int, default=None, help="maximum number of findings")
+    parser.add_argument("-j",  "--json",           action="store_true")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.store):
+        ptjsonlib.PtJsonLib().end_error(f"Result store {args.store} does not exist.", condition=args.json)
+    rows = ResultStore(args.store).query(host=args.host, finding_id=args.id, severity=args.severity, finding=args.finding,
+                                         since=args.since, until=args.until, limit=args.limit)
+    if args.json:
+        ptprint(json.dumps(rows), "", True)
+        return
+    for row in rows:
+        scanned = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["time"]))
+        ptprint(f"{scanned}  {row['host']}:{row['port']}  {row['id']}  {row['severity']}  {row['finding']}", "TEXT", True)
+    ptprint(f"{len(rows)} findings", "INFO", True)
+
 def main():
     global SCRIPTNAME
     SCRIPTNAME = os.path.splitext(os.path.basename(__file__))[0]
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        cache_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        query_main(sys.argv[2:])
+        return
     args = parse_args()
-    script = PtSSL(args)
+    if args.worker:
+        script = PtSSLWorker(args)
+    elif args.file:
+        script = PtSSLBatch(args)
+    else:
+        script = PtSSL(args)
     script.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# ptssl imports its helpers as top-level `helpers` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ptssl"))
@@ -0,0 +1,151 @@
+import asyncio
+import datetime
+import hashlib
+import socket
+import ssl
+import threading
+import time
+
+import pytest
+
+from helpers.batch import BatchRunner, cluster_targets, get_endpoint_fingerprint, read_targets
+
+
+def test_read_targets_skips_comments_blanks_and_duplicates(tmp_path):
+    path = tmp_path / "targets.txt"
+    path.write_text("https://a\n\n# comment\nhttps://b\n https://a \nhttps://c\n")
+    assert read_targets(str(path)) == ["https://a", "https://b", "https://c"]
+
+
+def run_batch(targets, **kwargs):
+    started, finished, running, peak = [], [], {}, {"all": 0}
+    group_of = kwargs.get("group_of") or (lambda target: target)
+
+    async def scan(target):
+        group = group_of(target)
+        started.append((target, time.monotonic()))
+        running[group] = running.get(group, 0) + 1
+        peak[group] = max(peak.get(group, 0), running[group])
+        peak["all"] = max(peak["all"], sum(running.values()))
+        await asyncio.sleep(0.02)
+        running[group] -= 1
+        return target.upper()
+
+    BatchRunner(targets, scan_target=scan, on_result=lambda target, result: finished.append(result), **kwargs).run()
+    return started, finished, peak
+
+
+def test_batch_runner_scans_every_target_in_order_within_parallel_limit():
+    targets = [f"t{i}" for i in range(20)]
+    started, finished, peak = run_batch(targets, parallel=3)
+    assert [target for target, _ in started] == targets
+    assert sorted(finished) == sorted(target.upper() for target in targets)
+    assert peak["all"] == 3
+
+
+def test_batch_runner_limits_scans_per_group():
+    targets = [f"a{i}" for i in range(6)] + ["b0", "b1"]
+    started, finished, peak = run_batch(targets, parallel=4, group_of=lambda target: target[0], per_group=1)
+    assert len(finished) == 8
+    assert peak["a"] == 1 and peak["b"] == 1
+    # Free workers take targets of other groups meanwhile
+    assert [target for target, _ in started][:2] == ["a0", "b0"]
+
+
+def test_batch_runner_delays_scans_of_one_group():
+    started, _, _ = run_batch(["a0", "a1", "b0"], parallel=4, group_of=lambda target: target[0], group_delay=0.1)
+    times = dict(started)
+    assert times["a1"] - times["a0"] >= 0.1
+    assert times["b0"] - times["a0"] < 0.05
+
+
+def test_batch_runner_combines_group_limit_and_delay():
+    targets = ["a0", "a1", "a2", "a3"]
+    started, finished, peak = run_batch(targets, parallel=4, group_of=lambda target: target[0], per_group=2, group_delay=0.03)
+    assert len(finished) == 4 and peak["a"] <= 2
+    times = [start for _, start in started]
+    assert all(later - earlier >= 0.03 for earlier, later in zip(times, times[1:]))
+
+
+def test_batch_runner_resolves_each_target_once():
+    calls, finished = [], []
+
+    def group_of(target):
+        calls.append(target)
+        return target[0]
+
+    async def scan(target):
+        await asyncio.sleep(0.01)
+        return target
+
+    BatchRunner(["a0", "b0", "a1", "b1"], 2, scan, lambda target, result: finished.append(result),
+                group_of=group_of, per_group=1).run()
+    assert sorted(calls) == ["a0", "a1", "b0", "b1"]
+    assert sorted(finished) == ["a0", "a1", "b0", "b1"]
+
+
+def test_cluster_targets_groups_by_fingerprint_in_target_order():
+    fingerprints = {"https://a": "x", "https://b": "y", "https://c": "x", "https://d": None, "https://e": None}
+    clusters = cluster_targets(list(fingerprints), fingerprints.get, parallel=2)
+    assert clusters == [["https://a", "https://c"], ["https://b"], ["https://d"], ["https://e"]]
+
+
+@pytest.fixture
+def tls_server(tmp_path):
+    """Serves TLS handshakes with a self signed certificate on localhost; yields (port, certificate DER)."""
+    pytest.importorskip("cryptography")
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+                   .serial_number(1).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+                   .sign(key, hashes.SHA256()))
+    (tmp_path / "cert.pem").write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    (tmp_path / "key.pem").write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                         serialization.NoEncryption()))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(tmp_path / "cert.pem", tmp_path / "key.pem")
+
+    listener = socket.create_server(("127.0.0.1", 0))
+    listener.settimeout(0.05)
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                continue
+            try:
+                with context.wrap_socket(connection, server_side=True) as tls:
+                    tls.recv(1)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield listener.getsockname()[1], certificate.public_bytes(serialization.Encoding.DER)
+    stop.set()
+    thread.join()
+    listener.close()
+
+
+def test_endpoint_fingerprint_is_shared_by_names_of_one_endpoint(tls_server):
+    port, certificate = tls_server
+    resolve = lambda host: "127.0.0.1"
+    first = get_endpoint_fingerprint(f"https://a.example:{port}", resolve=resolve)
+    second = get_endpoint_fingerprint(f"https://b.example:{port}", resolve=resolve)
+    assert first == second
+    assert first[:3] == ("127.0.0.1", port, hashlib.sha256(certificate).hexdigest())
+
+
+def test_endpoint_fingerprint_of_unreachable_target_is_none():
+    assert get_endpoint_fingerprint("https://a.example", resolve=lambda host: None) is None
+    with socket.create_server(("127.0.0.1", 0)) as closed:
+        port = closed.getsockname()[1]
+    assert get_endpoint_fingerprint(f"https://a.example:{port}", timeout=1, resolve=lambda host: "127.0.0.1") is None
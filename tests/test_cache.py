@@ -0,0 +1,145 @@
+import fcntl
+import json
+import os
+import time
+
+import pytest
+
+from helpers.cache import CacheManager, ResultCache, _pack, _unpack
+from helpers.testssl import build_testssl_flags, filter_sections, merge_results
+
+
+def roundtrip(items):
+    return _unpack(json.loads(json.dumps(_pack(items))))
+
+
+def test_pack_roundtrip_shares_common_values():
+    items = [
+        {"id": "TLS1", "ip": "example.com/192.0.2.1", "port": "443", "severity": "LOW", "finding": "offered"},
+        {"id": "TLS1_2", "ip": "example.com/192.0.2.1", "port": "443", "severity": "OK", "finding": "offered"},
+    ]
+    packed = _pack(items)
+    assert packed["shared"] == {"ip": "example.com/192.0.2.1", "port": "443", "finding": "offered"}
+    assert roundtrip(items) == items
+
+
+def test_pack_roundtrip_keeps_null_values_and_missing_keys():
+    items = [
+        {"id": "a", "severity": "OK", "cve": None},
+        {"id": "b", "severity": None, "cwe": "CWE-310"},
+        {"id": "c"},
+    ]
+    assert roundtrip(items) == items
+
+
+@pytest.mark.parametrize("items", [[], [{"id": "a", "finding": None}]])
+def test_pack_roundtrip_edge_cases(items):
+    assert roundtrip(items) == items
+
+
+def test_unpack_rejects_unknown_layout():
+    with pytest.raises(ValueError):
+        _unpack({"fields": [], "shared": {}, "rows": []})
+
+
+KEY_ARGS = {"testssl_version": "testssl 3.2.0", "profile": "full", "flags": ["-p"], "url": "https://example.com", "ip": "192.0.2.1"}
+
+
+def test_make_key_is_stable():
+    key = ResultCache.make_key(**KEY_ARGS)
+    assert key == ResultCache.make_key(**KEY_ARGS)
+    assert len(key) == 32 and int(key, 16) >= 0
+
+
+@pytest.mark.parametrize("field, value", [
+    ("testssl_version", "testssl 3.2.1"),
+    ("profile", "quick"),
+    ("flags", ["-p", "--sneaky"]),
+    ("url", "https://www.example.com"),
+    ("ip", "192.0.2.2"),
+    ("ip", None),
+])
+def test_make_key_changes_with_everything_shaping_the_result(field, value):
+    assert ResultCache.make_key(**{**KEY_ARGS, field: value}) != ResultCache.make_key(**KEY_ARGS)
+
+
+def test_store_and_load(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    items = [{"id": "TLS1", "severity": "OK", "finding": None}]
+    cache.store("0" * 32, items)
+    assert cache.load("0" * 32, max_age=60) == items
+    assert cache.load("1" * 32, max_age=60) is None
+
+
+def test_load_reads_plain_json_entries(tmp_path):
+    items = [{"id": "TLS1", "severity": "OK"}]
+    (tmp_path / f"{'0' * 32}.json").write_text(json.dumps(items))
+    assert ResultCache(str(tmp_path)).load("0" * 32, max_age=60) == items
+
+
+def test_load_removes_expired_entries(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.store("0" * 32, [{"id": "TLS1"}])
+    assert cache.load("0" * 32, max_age=-1) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sections_are_cached_and_reassembled_on_their_own(tmp_path):
+    scan = [
+        {"id": "scanTime", "finding": "12"},
+        {"id": "SSLv2", "finding": "not offered"},
+        {"id": "cipherlist_NULL", "finding": "not offered"},
+        {"id": "heartbleed", "finding": "not vulnerable"},
+    ]
+    cache = ResultCache(str(tmp_path))
+    key = lambda section: ResultCache.make_key("3.2", "full", build_testssl_flags([section]), "https://example.com", "192.0.2.1")
+    for section in ("protocols", "cipher_categories", "vulnerabilities"):
+        cache.store(key(section), filter_sections(scan, [section]))
+    assert len(os.listdir(tmp_path)) == 3
+
+    # A later scan of another module mix reuses the sections it needs
+    cached = [cache.load(key(section), max_age=60) for section in ("protocols", "vulnerabilities")]
+    assert merge_results(cached) == [scan[0], scan[1], scan[3]]
+
+    # Each section ages on its own
+    assert cache.load(key("cipher_categories"), max_age=-1) is None
+    assert cache.load(key("protocols"), max_age=60) == scan[:2]
+
+
+def touch(path, age=0, atime=None):
+    path.write_text("x" * 10)
+    mtime = time.time() - age
+    os.utime(path, (atime if atime is not None else mtime, mtime))
+
+
+def test_collect_evicts_least_recently_used_entries_and_digests(tmp_path):
+    touch(tmp_path / f"{'a' * 32}.json.gz", atime=100)
+    touch(tmp_path / f"{'b' * 32}.adaptive.json", atime=200)
+    touch(tmp_path / f"{'c' * 32}.json.xz", atime=300)
+    touch(tmp_path / "circuits.json", atime=0)
+
+    stats = CacheManager(str(tmp_path), max_bytes=0, max_entries=1).collect()
+
+    assert stats["evicted"] == 2 and stats["entries"] == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(["circuits.json", f"{'c' * 32}.json.xz"])
+
+
+def test_collect_removes_stale_files_not_held(tmp_path):
+    age = CacheManager.STALE_AGE + 60
+    touch(tmp_path / "old_x.tmp", age=age)
+    touch(tmp_path / "new_x.tmp")
+    touch(tmp_path / "unused.lock", age=age)
+    touch(tmp_path / "held.lock", age=age)
+
+    with open(tmp_path / "held.lock", "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        stats = CacheManager(str(tmp_path), max_bytes=0, max_entries=0).collect()
+
+    assert stats["stale"] == 2
+    assert sorted(os.listdir(tmp_path)) == ["held.lock", "new_x.tmp"]
+
+
+def test_maybe_collect_is_rate_limited(tmp_path):
+    manager = CacheManager(str(tmp_path), max_bytes=0, max_entries=0)
+    assert manager.maybe_collect() is not None
+    assert manager.maybe_collect() is None
@@ -0,0 +1,130 @@
+import asyncio
+import datetime
+import os
+import re
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from helpers.engines import certificate
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ptssl", "modules")
+
+
+def issue(name: str, issuer=None, ca: bool = True, san: list = None, days: int = 365):
+    """Returns (certificate, key) signed by `issuer` (certificate, key), self signed without one."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, name)])
+    issuer_certificate, issuer_key = issuer or (None, key)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    builder = (x509.CertificateBuilder()
+               .subject_name(subject)
+               .issuer_name(issuer_certificate.subject if issuer_certificate else subject)
+               .public_key(key.public_key())
+               .serial_number(x509.random_serial_number())
+               .not_valid_before(now - datetime.timedelta(days=1))
+               .not_valid_after(now + datetime.timedelta(days=days))
+               .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True))
+    if san:
+        builder = builder.add_extension(x509.SubjectAlternativeName([x509.DNSName(name) for name in san]), critical=False)
+    return builder.sign(issuer_key, hashes.SHA256()), key
+
+
+@pytest.fixture
+def pki(monkeypatch):
+    root = issue("Test Root")
+    upper = issue("Test Upper CA", root)
+    lower = issue("Test Lower CA", upper)
+    leaf = issue("www.example.com", lower, ca=False, san=["www.example.com", "example.com"])
+    monkeypatch.setattr(certificate, "_trust_store", {root[0].subject.public_bytes(): [root[0]]})
+    monkeypatch.setattr(certificate, "_validation_cache", {})
+    return {"root": root[0], "upper": upper[0], "lower": lower[0], "leaf": leaf[0]}
+
+
+def der(cert) -> bytes:
+    return cert.public_bytes(serialization.Encoding.DER)
+
+
+def tsd_offsets() -> dict:
+    """Row offsets TSD reads relative to cert_signatureAlgorithm."""
+    with open(os.path.join(MODULES_DIR, "tsd.py")) as f:
+        source = f.read()
+    names = ("CERT_SIG_ALGO", "CERT_KEY_SIZE", "CERT_TRUST", "CERT_CHAIN_OF_TRUST", "CERT_EXPIRATION", "OCSP_STAPLING", "CERT_TRANSPARENCY")
+    return {name: int(re.search(rf"^\s+{name} = (\d+)$", source, re.MULTILINE).group(1)) for name in names}
+
+
+def test_section_layout_matches_tsd_offsets():
+    layout = certificate.SECTION_LAYOUT
+    assert len(layout) == len(set(layout))
+    assert {name: layout[offset] for name, offset in tsd_offsets().items()} == {
+        "CERT_SIG_ALGO": "cert_signatureAlgorithm",
+        "CERT_KEY_SIZE": "cert_keySize",
+        "CERT_TRUST": "cert_trust",
+        "CERT_CHAIN_OF_TRUST": "cert_chain_of_trust",
+        "CERT_EXPIRATION": "cert_notAfter",
+        "OCSP_STAPLING": "OCSP_stapling",
+        "CERT_TRANSPARENCY": "certificate_transparency",
+    }
+
+
+def test_validate_chain(pki):
+    assert certificate._validate(pki["leaf"], [pki["lower"], pki["upper"]]) == (True, "")
+    assert certificate._validate(pki["leaf"], []) == (False, "unable to get local issuer certificate")
+    self_signed, _ = issue("self.example.com", ca=False)
+    assert certificate._validate(self_signed, []) == (False, "self signed")
+
+
+def test_intermediate_verdict_depends_on_the_chain_it_was_sent_with(pki):
+    # The lower CA cannot be validated without the upper CA ...
+    assert certificate._validate(pki["leaf"], [pki["lower"]])[0] is False
+    # ... which must not stick to chains that do include it
+    assert certificate._validate(pki["leaf"], [pki["lower"], pki["upper"]]) == (True, "")
+    assert certificate._validate(pki["leaf"], [pki["lower"]])[0] is False
+
+
+def test_matches_host():
+    assert certificate._matches_host("www.example.com", ["*.example.com"])
+    assert certificate._matches_host("Example.COM.", ["example.com"])
+    assert not certificate._matches_host("a.b.example.com", ["*.example.com"])
+    assert not certificate._matches_host("example.com", ["*.example.com"])
+
+
+def test_probe_certificate_keeps_testssl_shape(pki, monkeypatch):
+    async def collect(host, ip, port, semaphore):
+        return {"chain": [der(pki["leaf"]), der(pki["lower"]), der(pki["upper"])],
+                "ocsp_stapling": False, "sct_tls_extension": True}
+
+    monkeypatch.setattr(certificate, "_collect", collect)
+    rows = asyncio.run(certificate.probe_certificate("www.example.com", "192.0.2.1", 443, asyncio.Semaphore(2), None))
+
+    assert [row["id"] for row in rows] == list(certificate.SECTION_LAYOUT)
+    assert all(row["ip"] == "www.example.com/192.0.2.1" and row["port"] == "443" for row in rows)
+    offsets = tsd_offsets()
+    finding = lambda name: (rows[offsets[name]]["severity"], rows[offsets[name]]["finding"])
+    assert finding("CERT_SIG_ALGO")[0] == "OK" and finding("CERT_SIG_ALGO")[1].startswith("SHA256 with ")
+    assert finding("CERT_KEY_SIZE") == ("OK", "EC 256 bits")
+    assert finding("CERT_TRUST") == ("OK", "Ok via SAN")
+    assert finding("CERT_CHAIN_OF_TRUST") == ("OK", "passed.")
+    assert finding("CERT_EXPIRATION")[0] == "OK"
+    assert finding("OCSP_STAPLING") == ("LOW", "not offered")
+    assert finding("CERT_TRANSPARENCY") == ("OK", "yes (TLS extension)")
+    assert rows[certificate.SECTION_LAYOUT.index("certs_countServer")]["finding"] == "3"
+
+
+def test_probe_certificate_reports_name_mismatch_and_untrusted_chain(pki, monkeypatch):
+    async def collect(host, ip, port, semaphore):
+        return {"chain": [der(pki["leaf"])], "ocsp_stapling": None, "sct_tls_extension": None}
+
+    monkeypatch.setattr(certificate, "_collect", collect)
+    rows = asyncio.run(certificate.probe_certificate("other.example.org", "192.0.2.1", 443, asyncio.Semaphore(2), None))
+    by_id = {row["id"]: (row["severity"], row["finding"]) for row in rows}
+    assert by_id["cert_trust"] == ("HIGH", "certificate does not match supplied URI")
+    assert by_id["cert_chain_of_trust"] == ("CRITICAL", "failed (unable to get local issuer certificate).")
+    assert by_id["OCSP_stapling"] == ("INFO", "not tested (TLS 1.3 only server)")
+    assert by_id["certificate_transparency"] == ("LOW", "no")
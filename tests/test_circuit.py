@@ -0,0 +1,62 @@
+import pytest
+
+from helpers import circuit
+from helpers.circuit import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(circuit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker(tmp_path):
+    return CircuitBreaker(str(tmp_path / "circuits.json"))
+
+
+def test_failure_opens_host_with_growing_backoff(breaker, clock):
+    assert breaker.check("a.example", "192.0.2.1") is None
+    breaker.record_failure("a.example", "192.0.2.1", "timeout")
+    assert "host a.example failed 1 times (timeout)" in breaker.check("a.example", "192.0.2.1")
+
+    clock[0] += CircuitBreaker.BASE_BACKOFF
+    assert breaker.check("a.example", "192.0.2.1") is None  # half open: one attempt is let through
+    breaker.record_failure("a.example", "192.0.2.1", "timeout")
+    clock[0] += CircuitBreaker.BASE_BACKOFF
+    assert "failed 2 times" in breaker.check("a.example", "192.0.2.1")
+    clock[0] += CircuitBreaker.BASE_BACKOFF
+    assert breaker.check("a.example", "192.0.2.1") is None
+
+
+def test_subnet_opens_at_threshold(breaker, clock):
+    for index in range(CircuitBreaker.SUBNET_THRESHOLD - 1):
+        breaker.record_failure(f"h{index}.example", f"192.0.2.{index}", "refused")
+    assert breaker.check("other.example", "192.0.2.200") is None
+
+    breaker.record_failure("last.example", "192.0.2.99", "refused")
+    assert breaker.check("other.example", "192.0.2.200").startswith("subnet 192.0.2.0/24 has 3 failing hosts")
+    assert breaker.check("other.example", "198.51.100.1") is None
+    assert breaker.check("other.example") is None
+
+
+def test_success_closes_host_and_subnet(breaker, clock):
+    for index in range(CircuitBreaker.SUBNET_THRESHOLD):
+        breaker.record_failure(f"h{index}.example", f"192.0.2.{index}", "refused")
+    breaker.record_success("h0.example", "192.0.2.0")
+    assert breaker.check("h0.example", "192.0.2.0") is None
+    assert breaker.check("other.example", "192.0.2.200") is None
+    assert breaker.check("h1.example", "192.0.2.1") is not None
+
+
+def test_purge_expired(breaker, clock):
+    breaker.record_failure("old.example", "192.0.2.1", "timeout")
+    clock[0] += CircuitBreaker.MAX_BACKOFF
+    breaker.record_failure("new.example", "198.51.100.1", "timeout")
+    clock[0] += CircuitBreaker.BASE_BACKOFF + 1
+    assert breaker.purge_expired() == 2  # host and subnet of old.example
+    assert breaker.check("new.example", "198.51.100.1") is None
+    assert breaker.purge_expired() == 0
+    breaker.record_failure("new.example", "198.51.100.1", "timeout")
+    assert "failed 2 times" in breaker.check("new.example", "198.51.100.1")
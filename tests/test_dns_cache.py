@@ -0,0 +1,98 @@
+import socket
+
+from types import SimpleNamespace
+
+import pytest
+
+from helpers import dns_cache
+from helpers.dns_cache import DnsCache
+
+
+class FakeDnsException(Exception):
+    pass
+
+
+class FakeAnswer(list):
+    """Records of a dnspython answer; `response.answer` holds the rrsets of the CNAME chain."""
+
+    def __init__(self, addresses: list, ttls: list) -> None:
+        super().__init__(SimpleNamespace(to_text=lambda address=address: address) for address in addresses)
+        self.response = SimpleNamespace(answer=[SimpleNamespace(ttl=ttl) for ttl in ttls])
+
+
+def fake_dns(records: dict):
+    """Returns a stand-in of the dnspython package answering from {(host, type): (addresses, rrset TTLs)}."""
+    def resolve(host, record_type):
+        if (host, record_type) not in records:
+            raise FakeDnsException(host)
+        return FakeAnswer(*records[(host, record_type)])
+
+    return SimpleNamespace(resolver=SimpleNamespace(resolve=resolve), exception=SimpleNamespace(DNSException=FakeDnsException))
+
+
+@pytest.fixture
+def system(monkeypatch):
+    """Fake getaddrinfo answering from a dict host -> addresses, counting lookups."""
+    hosts = {}
+    lookups = []
+
+    def getaddrinfo(host, port, type=0):
+        lookups.append(host)
+        if host not in hosts:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET6 if ":" in address else socket.AF_INET, type, 6, "", (address, 0)) for address in hosts[host]]
+
+    clock = [1000.0]
+    monkeypatch.setattr(dns_cache.socket, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(dns_cache.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(dns_cache, "dns", None)
+    return SimpleNamespace(hosts=hosts, lookups=lookups, clock=clock)
+
+
+def test_ip_addresses_are_not_resolved(system):
+    assert DnsCache().resolve("192.0.2.1") == "192.0.2.1"
+    assert DnsCache().resolve("2001:db8::1") == "2001:db8::1"
+    assert system.lookups == []
+
+
+def test_system_resolver_prefers_ipv4_and_caches_for_default_ttl(system):
+    system.hosts["a.example"] = ["2001:db8::1", "192.0.2.1"]
+    cache = DnsCache(default_ttl=60)
+    assert cache.resolve("a.example") == "192.0.2.1"
+    system.clock[0] += 59
+    assert cache.resolve("a.example") == "192.0.2.1"
+    assert system.lookups == ["a.example"]
+    system.clock[0] += 2
+    cache.resolve("a.example")
+    assert system.lookups == ["a.example", "a.example"]
+
+
+def test_unresolvable_host_is_not_cached(system):
+    cache = DnsCache()
+    assert cache.resolve("missing.example") is None
+    assert cache.resolve("missing.example") is None
+    assert system.lookups == ["missing.example", "missing.example"]
+
+
+def test_dns_ttl_is_lowest_ttl_of_the_cname_chain(system, monkeypatch):
+    system.hosts["www.example"] = ["192.0.2.1"]
+    monkeypatch.setattr(dns_cache, "dns", fake_dns({("www.example", "A"): (["192.0.2.1"], [3600, 30])}))
+    cache = DnsCache(default_ttl=300)
+    assert cache.resolve("www.example") == "192.0.2.1"
+    system.clock[0] += 31
+    cache.resolve("www.example")
+    assert system.lookups == ["www.example", "www.example"]
+
+
+def test_names_outside_dns_keep_their_address_with_default_ttl(system, monkeypatch):
+    # e.g. /etc/hosts entries: unknown to DNS, or overriding the DNS answer
+    system.hosts["local.example"] = ["10.0.0.5"]
+    system.hosts["pinned.example"] = ["10.0.0.6"]
+    monkeypatch.setattr(dns_cache, "dns", fake_dns({("pinned.example", "A"): (["192.0.2.9"], [5])}))
+    cache = DnsCache(default_ttl=300)
+    assert cache.resolve("local.example") == "10.0.0.5"
+    assert cache.resolve("pinned.example") == "10.0.0.6"
+    system.clock[0] += 299
+    cache.resolve("local.example")
+    cache.resolve("pinned.example")
+    assert system.lookups == ["local.example", "pinned.example"]
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import re
+import ssl
+import struct
+
+from types import SimpleNamespace
+
+import pytest
+
+from helpers.engines import NativeEngineError, ciphers, headers, protocols
+from helpers.testssl import SECTION_LAST_IDS, get_section_of_id
+from helpers.engines._tls import (TLS1_VERSION, TLS1_2_VERSION, build_client_hello, create_probe_context,
+                                  parse_server_hello, send_client_hello)
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ptssl", "modules")
+
+
+def module_constant(module: str, name: str) -> int:
+    """Reads an integer class constant of a test module (modules need ptlibs to be imported)."""
+    with open(os.path.join(MODULES_DIR, f"{module}.py")) as f:
+        return int(re.search(rf"^\s+{name} = (\d+)$", f.read(), re.MULTILINE).group(1))
+
+
+def server_hello(version: int, cipher_suite: int, session_id: bytes = b"") -> bytes:
+    """Returns a ServerHello handshake message."""
+    body = struct.pack("!H", version) + bytes(32) + bytes([len(session_id)]) + session_id
+    body += struct.pack("!HB", cipher_suite, 0)
+    return bytes([0x02]) + len(body).to_bytes(3, "big") + body
+
+
+def offered_suites(client_hello: bytes) -> list:
+    """Returns the cipher suites of a ClientHello record without session id."""
+    length = struct.unpack("!H", client_hello[44:46])[0]
+    return [struct.unpack("!H", client_hello[offset:offset + 2])[0] for offset in range(46, 46 + length, 2)]
+
+
+def record(content_type: int, payload: bytes) -> bytes:
+    return bytes([content_type]) + struct.pack("!HH", TLS1_2_VERSION, len(payload)) + payload
+
+
+async def answer_once(response: bytes, callback):
+    """Serves `response` to the first client on localhost and awaits `callback(port)`."""
+    async def handle(reader, writer):
+        await reader.read(4096)
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+        return await callback(server.sockets[0].getsockname()[1])
+
+
+def test_probe_context_limited_to_version():
+    context = create_probe_context(ssl.TLSVersion.TLSv1_2)
+    assert context.minimum_version == context.maximum_version == ssl.TLSVersion.TLSv1_2
+    assert context.verify_mode == ssl.CERT_NONE
+
+
+def test_unsupported_cipher_string_raises_native_engine_error(monkeypatch):
+    def set_ciphers(self, ciphers):
+        raise ssl.SSLError("No cipher can be selected.")
+
+    monkeypatch.setattr(ssl.SSLContext, "set_ciphers", set_ciphers)
+    with pytest.raises(NativeEngineError, match="TLSv1_2"):
+        create_probe_context(ssl.TLSVersion.TLSv1_2)
+
+
+def test_client_hello_layout():
+    hello = build_client_hello(TLS1_2_VERSION, [0xC02F, 0x0005], "www.example.com")
+    content_type, record_version, length = struct.unpack("!BHH", hello[:5])
+    assert (content_type, record_version, length) == (0x16, TLS1_VERSION, len(hello) - 5)
+    assert hello[5] == 0x01 and int.from_bytes(hello[6:9], "big") == len(hello) - 9
+    assert struct.unpack("!H", hello[9:11])[0] == TLS1_2_VERSION
+    assert offered_suites(hello) == [0xC02F, 0x0005]
+    assert b"www.example.com" in hello
+    assert b"192.0.2.1" not in build_client_hello(TLS1_2_VERSION, [0xC02F], "192.0.2.1")  # no SNI for addresses
+
+
+def test_parse_server_hello():
+    assert parse_server_hello(server_hello(TLS1_2_VERSION, 0xC02F)) == (TLS1_2_VERSION, 0xC02F)
+    assert parse_server_hello(server_hello(TLS1_VERSION, 0x0035, session_id=bytes(32))) == (TLS1_VERSION, 0x0035)
+    assert parse_server_hello(b"\x0b" + bytes(50)) is None  # not a ServerHello
+    assert parse_server_hello(server_hello(TLS1_2_VERSION, 0xC02F)[:38]) is None
+
+
+def test_send_client_hello_reads_server_hello():
+    hello = build_client_hello(TLS1_2_VERSION, [0xC02F], "localhost")
+    response = record(0x16, server_hello(TLS1_2_VERSION, 0xC02F))
+    result = asyncio.run(answer_once(response, lambda port: send_client_hello("127.0.0.1", port, hello)))
+    assert result == (TLS1_2_VERSION, 0xC02F)
+
+
+def test_send_client_hello_refused_by_alert():
+    hello = build_client_hello(TLS1_2_VERSION, [0xC02F], "localhost")
+    response = record(0x15, b"\x02\x28")  # fatal handshake_failure
+    assert asyncio.run(answer_once(response, lambda port: send_client_hello("127.0.0.1", port, hello))) is None
+
+
+def test_probe_protocols_keeps_testssl_shape(monkeypatch):
+    offered = {"TLS1_2", "TLS1_3"}
+
+    async def is_offered(protocol, host, ip, port):
+        return protocol in offered
+
+    monkeypatch.setattr(protocols, "_is_offered", is_offered)
+    rows = asyncio.run(protocols.probe_protocols("example.com", "192.0.2.1", 443, asyncio.Semaphore(2), None))
+
+    # PT reads PRO_SEC_LEN rows starting at SSLv2
+    assert [row["id"] for row in rows] == ["SSLv2", "SSLv3", "TLS1", "TLS1_1", "TLS1_2", "TLS1_3"]
+    assert len(rows) == module_constant("pt", "PRO_SEC_LEN")
+    assert rows[0] == {"id": "SSLv2", "ip": "example.com/192.0.2.1", "port": "443", "severity": "OK", "finding": "not offered"}
+    assert [(row["severity"], row["finding"]) for row in rows[4:]] == [("OK", "offered"), ("OK", "offered with final")]
+
+
+def test_cipher_categories_mapping():
+    assert list(ciphers.CIPHER_CATEGORIES) == [
+        "cipherlist_NULL", "cipherlist_aNULL", "cipherlist_EXPORT", "cipherlist_LOW", "cipherlist_3DES_IDEA",
+        "cipherlist_OBSOLETED", "cipherlist_STRONG_NOFS", "cipherlist_STRONG_FS",
+    ]
+    suites = [suite for category_suites, _, _ in ciphers.CIPHER_CATEGORIES.values() for suite in category_suites]
+    assert len(suites) == len(set(suites))  # every suite counts for one category only
+    category_of = {suite: category for category, (category_suites, _, _) in ciphers.CIPHER_CATEGORIES.items()
+                   for suite in category_suites}
+    assert category_of[0x0001] == "cipherlist_NULL"          # TLS_RSA_WITH_NULL_MD5
+    assert category_of[0x0003] == "cipherlist_EXPORT"        # TLS_RSA_EXPORT_WITH_RC4_40_MD5
+    assert category_of[0x000A] == "cipherlist_3DES_IDEA"     # TLS_RSA_WITH_3DES_EDE_CBC_SHA
+    assert category_of[0x002F] == "cipherlist_OBSOLETED"     # TLS_RSA_WITH_AES_128_CBC_SHA
+    assert category_of[0x009C] == "cipherlist_STRONG_NOFS"   # TLS_RSA_WITH_AES_128_GCM_SHA256
+    assert category_of[0xC02F] == "cipherlist_STRONG_FS"     # TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256
+
+
+def test_probe_cipher_categories_keeps_testssl_shape(monkeypatch):
+    async def send_client_hello(ip, port, client_hello):
+        suites = offered_suites(client_hello)
+        if 0x000A in suites:  # 3DES offered: the server picks it
+            return TLS1_2_VERSION, 0x000A
+        if 0xC02F in suites:  # the server answers with a suite that was not offered
+            return TLS1_2_VERSION, 0x000A
+        return None
+
+    async def tls_handshake(ip, port, context, server_name=None):
+        return {"version": "TLSv1.3"}
+
+    monkeypatch.setattr(ciphers, "send_client_hello", send_client_hello)
+    monkeypatch.setattr(ciphers, "tls_handshake", tls_handshake)
+    rows = asyncio.run(ciphers.probe_cipher_categories("example.com", "192.0.2.1", 443, asyncio.Semaphore(2), None))
+
+    # CT reads CIPHER_SEC_LEN rows starting at cipherlist_NULL
+    assert [row["id"] for row in rows] == list(ciphers.CIPHER_CATEGORIES)
+    assert len(rows) == module_constant("ct", "CIPHER_SEC_LEN")
+    assert {get_section_of_id(row["id"]) for row in rows} == {"cipher_categories"}
+    assert rows[-1]["id"] == SECTION_LAST_IDS["cipher_categories"]
+    findings = {row["id"]: (row["severity"], row["finding"]) for row in rows}
+    assert findings["cipherlist_3DES_IDEA"] == ("MEDIUM", "offered")
+    assert findings["cipherlist_NULL"] == ("OK", "not offered")
+    assert findings["cipherlist_STRONG_NOFS"] == ("INFO", "not offered")
+    assert findings["cipherlist_STRONG_FS"] == ("OK", "offered")  # through the TLS 1.3 handshake
+
+
+def response(status_code: int, reason: str = "OK", **header_fields):
+    return SimpleNamespace(status_code=status_code, reason=reason,
+                           headers={name.replace("_", "-"): value for name, value in header_fields.items()})
+
+
+@pytest.mark.parametrize("http_response, finding", [
+    (response(301, "Moved Permanently", Location="https://example.com/"), '301 Moved Permanently ("https://example.com/")'),
+    (response(302, "Found", Location="http://example.com/login"), 'redirect to "http://example.com/login", not to HTTPS'),
+    (response(200), "OK, no redirect to HTTPS"),
+    (None, "no HTTP response on port 80"),
+])
+def test_redirect_finding(http_response, finding):
+    assert headers._redirect_finding(http_response) == finding
+
+
+@pytest.mark.parametrize("https_response, expected", [
+    (response(200, Strict_Transport_Security="max-age=31536000; includeSubDomains"),
+     ("OK", "365 days (=31536000 seconds) >= 15552000 seconds")),
+    (response(200, Strict_Transport_Security="max-age=86400"), ("LOW", "1 days (=86400 seconds) < 15552000 seconds, too short")),
+    (response(200, Strict_Transport_Security="max-age=0"), ("LOW", "HSTS max-age is set to 0. HSTS is disabled")),
+    (response(200, Strict_Transport_Security="includeSubDomains"), ("LOW", 'invalid header "includeSubDomains"')),
+    (response(200), ("LOW", "not offered")),
+    (None, ("WARN", "no HTTPS response, HSTS could not be checked")),
+])
+def test_hsts_finding(https_response, expected):
+    assert headers._hsts_finding(https_response) == expected
+
+
+def test_probe_headers_keeps_testssl_shape():
+    responses = {
+        "http://example.com": response(301, "Moved Permanently", Location="https://example.com/"),
+        "https://example.com:8443": response(200, Strict_Transport_Security="max-age=31536000"),
+    }
+    helpers = SimpleNamespace(fetch=responses.get)
+    rows = asyncio.run(headers.probe_headers("example.com", "192.0.2.1", 8443, asyncio.Semaphore(2), helpers))
+
+    # HTTPRT and HSTST look their rows up by id
+    assert [row["id"] for row in rows] == ["HTTP_status_code", "HSTS"]
+    assert {get_section_of_id(row["id"]) for row in rows} == {"headers"}
+    assert rows[0]["finding"].startswith("301 ") and rows[1]["severity"] == "OK"
+    assert all(row["ip"] == "example.com/192.0.2.1" and row["port"] == "8443" for row in rows)
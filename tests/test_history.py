@@ -0,0 +1,59 @@
+import json
+
+from helpers.history import DurationHistory
+
+
+def test_predict_per_target_and_profile(tmp_path):
+    path = str(tmp_path / "penterep" / "target_runtimes.jsonl")
+    history = DurationHistory(path)
+    assert history.predict("https://a.example", "full", 300) == 300  # no file yet
+    DurationHistory(path).record("https://a.example", "full", 120.04)
+    DurationHistory(path).record("https://a.example", "quick", 10)
+    DurationHistory(path).record("https://b.example", "full", 40)
+
+    history = DurationHistory(path)
+    assert history.predict("https://a.example", "full", 300) == 120.0
+    assert history.predict("https://a.example", "quick", 300) == 10
+    assert history.predict("https://b.example", "full", 300) == 40
+    assert history.predict("https://b.example", "quick", 300) == 300
+    assert history.predict("https://c.example", "full", 300) == 300
+
+
+def test_prediction_is_median_of_recent_runtimes(tmp_path):
+    path = str(tmp_path / "target_runtimes.jsonl")
+    history = DurationHistory(path)
+    for seconds in (1000, 1000, 1000, 10, 20, 30, 40):
+        history.record("https://a.example", "full", seconds)
+    assert DurationHistory(path).predict("https://a.example", "full", 0) == 30  # last HISTORY_SIZE runtimes
+
+
+def test_history_is_read_once(tmp_path):
+    path = str(tmp_path / "target_runtimes.jsonl")
+    history = DurationHistory(path)
+    history.record("https://a.example", "full", 100)
+    assert history.predict("https://a.example", "full", 0) == 100
+    DurationHistory(path).record("https://a.example", "full", 500)
+    assert history.predict("https://a.example", "full", 0) == 100
+    assert DurationHistory(path).predict("https://a.example", "full", 0) == 300
+
+
+def test_malformed_lines_are_skipped(tmp_path):
+    path = tmp_path / "target_runtimes.jsonl"
+    path.write_text('{broken\n{"target": "https://a.example"}\n'
+                    '{"target": "https://a.example", "profile": "full", "seconds": 50}\n')
+    assert DurationHistory(str(path)).predict("https://a.example", "full", 0) == 50
+
+
+def test_large_file_is_compacted_to_recent_runtimes(tmp_path, monkeypatch):
+    monkeypatch.setattr(DurationHistory, "MAX_FILE_SIZE", 1000)
+    path = tmp_path / "target_runtimes.jsonl"
+    history = DurationHistory(str(path))
+    for seconds in range(20):
+        history.record("https://a.example", "full", seconds)
+        history.record("https://b.example", "full", seconds)
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert path.stat().st_size <= 1000
+    assert len(entries) <= 2 * DurationHistory.HISTORY_SIZE + 6  # compacted, then appended to again
+    assert entries[-1] == {"target": "https://b.example", "profile": "full", "seconds": 19}
+    assert DurationHistory(str(path)).predict("https://a.example", "full", 0) == 17
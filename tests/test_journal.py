@@ -0,0 +1,45 @@
+from helpers.journal import Journal, read_completed
+
+
+def test_last_event_decides_completion(tmp_path):
+    path = str(tmp_path / "batch.journal")
+    journal = Journal(path)
+    for target in ("https://a.example", "https://b.example", "https://c.example"):
+        journal.write("queued", target)
+        journal.write("started", target)
+    journal.write("finished", "https://a.example", digest="1")
+    journal.write("failed", "https://b.example", digest="2")
+    journal.write("finished", "https://c.example", digest="3")
+    journal.write("started", "https://c.example")
+    journal.close()
+    assert read_completed(path) == {"https://a.example"}
+
+
+def test_resume_after_truncated_line(tmp_path):
+    path = tmp_path / "batch.journal"
+    journal = Journal(str(path))
+    journal.write("finished", "https://a.example", digest="1")
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"time": 1, "event": "finished", "target": "https://b.exa')
+
+    assert read_completed(str(path)) == {"https://a.example"}
+
+    journal = Journal(str(path))
+    journal.write("finished", "https://b.example", digest="2")
+    journal.close()
+    assert read_completed(str(path)) == {"https://a.example", "https://b.example"}
+
+
+def test_lines_that_are_not_events_are_skipped(tmp_path):
+    path = tmp_path / "batch.journal"
+    path.write_text("\n".join([
+        '[1]',
+        '"finished"',
+        'null',
+        '{"event": "finished"}',
+        '{"target": "https://b.example"}',
+        '{"target": ["https://c.example"], "event": "finished"}',
+        '{"time": 1, "event": "finished", "target": "https://a.example"}',
+    ]) + "\n")
+    assert read_completed(str(path)) == {"https://a.example"}
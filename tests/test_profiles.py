@@ -0,0 +1,57 @@
+import json
+
+from helpers.profiles import BUDGET_ORDER, DEFAULT_PROFILE, PROFILES, ProfileRuntimes
+
+
+def test_profiles_cover_the_budget_order():
+    assert DEFAULT_PROFILE in PROFILES
+    assert set(BUDGET_ORDER) <= set(PROFILES)
+    assert BUDGET_ORDER[-1] == "quick"
+
+
+def test_median_of_recorded_runtimes(tmp_path):
+    runtimes = ProfileRuntimes(str(tmp_path / "penterep" / "runtimes.json"))
+    assert runtimes.median("full") is None
+    for seconds in (100, 300, 200.04):
+        runtimes.record("full", seconds)
+    runtimes.record("quick", 10)
+    assert runtimes.median("full") == 200.0
+    assert runtimes.median("quick") == 10
+    assert runtimes.median("standard") is None
+
+
+def test_only_recent_runtimes_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(ProfileRuntimes, "HISTORY_SIZE", 3)
+    path = tmp_path / "runtimes.json"
+    runtimes = ProfileRuntimes(str(path))
+    for seconds in (1000, 1000, 1, 2, 3):
+        runtimes.record("full", seconds)
+    assert json.loads(path.read_text()) == {"full": [1, 2, 3]}
+    assert runtimes.median("full") == 2
+
+
+def test_unreadable_file_has_no_median(tmp_path):
+    path = tmp_path / "runtimes.json"
+    path.write_text("{broken")
+    runtimes = ProfileRuntimes(str(path))
+    assert runtimes.median("full") is None
+    runtimes.record("full", 5)  # a broken file is replaced
+    assert runtimes.median("full") == 5
+
+
+def test_select_most_thorough_profile_within_budget(tmp_path):
+    runtimes = ProfileRuntimes(str(tmp_path / "runtimes.json"))
+    assert runtimes.select(10_000) == "quick"  # nothing measured yet
+    runtimes.record("full", 600)
+    runtimes.record("standard", 240)
+    runtimes.record("quick", 60)
+    assert runtimes.select(600) == "full"
+    assert runtimes.select(599) == "standard"
+    assert runtimes.select(100) == "quick"
+    assert runtimes.select(1) == "quick"  # nothing fits
+
+
+def test_unmeasured_profiles_do_not_fit(tmp_path):
+    runtimes = ProfileRuntimes(str(tmp_path / "runtimes.json"))
+    runtimes.record("standard", 100)
+    assert runtimes.select(10_000) == "standard"
@@ -0,0 +1,106 @@
+import asyncio
+import os
+
+import pytest
+
+from helpers.slots import HostSlots
+
+
+@pytest.fixture
+def slots_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(HostSlots, "POLL_INTERVAL", 0.01)
+    return lambda count: HostSlots(str(tmp_path), count)
+
+
+def queue_files(directory) -> list:
+    return [name for name in os.listdir(directory) if ".wait." in name or ".enqueue." in name]
+
+
+async def hold(slots, name: str, events: list, release: asyncio.Event, count: int = 1):
+    positions = []
+    async with slots.acquire(count, on_wait=positions.append):
+        events.append((name, positions))
+        await release.wait()
+
+
+def test_waiters_are_served_in_fifo_order(slots_factory, tmp_path):
+    async def scenario():
+        slots = slots_factory(1)
+        events = []
+        releases = {name: asyncio.Event() for name in "abc"}
+        tasks = {}
+        for name in "abc":
+            tasks[name] = asyncio.create_task(hold(slots, name, events, releases[name]))
+            await asyncio.sleep(0.05)
+        assert [name for name, _ in events] == ["a"]
+        for name in "abc":
+            releases[name].set()
+            await tasks[name]
+        return events
+
+    events = asyncio.run(scenario())
+    assert events == [("a", [0]), ("b", [0]), ("c", [2, 0])]  # c waited behind b, b was the head of the queue
+    assert queue_files(tmp_path) == []
+
+
+def test_holder_of_several_slots_waits_for_all(slots_factory):
+    async def scenario():
+        slots = slots_factory(3)
+        events = []
+        release_a, release_b = asyncio.Event(), asyncio.Event()
+        task_a = asyncio.create_task(hold(slots, "a", events, release_a, count=2))
+        await asyncio.sleep(0.05)
+        task_b = asyncio.create_task(hold(slots, "b", events, release_b, count=2))
+        await asyncio.sleep(0.05)
+        assert [name for name, _ in events] == ["a"]  # one slot is free, b needs two
+        release_a.set()
+        await task_a
+        await asyncio.sleep(0.05)
+        assert [name for name, _ in events] == ["a", "b"]
+        release_b.set()
+        await task_b
+
+    asyncio.run(scenario())
+
+
+def test_more_slots_than_exist_are_rejected(slots_factory):
+    async def scenario():
+        async with slots_factory(2).acquire(3):
+            pass
+
+    with pytest.raises(ValueError, match="Cannot hold 3 of 2 slots"):
+        asyncio.run(scenario())
+    assert slots_factory(0).slots == 1
+
+
+def test_wait_file_of_dead_process_is_removed(slots_factory, tmp_path):
+    dead = tmp_path / "testssl.wait.00000000000000000001.dead"
+    dead.write_text("")  # not locked by anybody
+
+    async def scenario():
+        positions = []
+        async with slots_factory(1).acquire(on_wait=positions.append):
+            return positions
+
+    assert asyncio.run(scenario()) == [0]
+    assert queue_files(tmp_path) == []
+
+
+def test_cancelled_waiter_leaves_the_queue(slots_factory, tmp_path):
+    async def scenario():
+        slots = slots_factory(1)
+        events = []
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(slots, "a", events, release))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(hold(slots, "b", events, asyncio.Event()))
+        await asyncio.sleep(0.05)
+        assert len(queue_files(tmp_path)) == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+    assert queue_files(tmp_path) == []
@@ -0,0 +1,42 @@
+import os
+
+from helpers.spool import Spool
+
+
+def add_target(directory, name="batch1", urls="https://example.com\n"):
+    (directory / f"{name}.target").write_text(urls)
+
+
+def test_lease_and_complete(tmp_path):
+    add_target(tmp_path)
+    spool = Spool(str(tmp_path), lease_time=60, worker_id="w1")
+    lease = spool.lease()
+    assert lease.name == "batch1.target"
+    assert lease.is_held()
+    assert spool.lease() is None
+
+    result = tmp_path / "result.tmp"
+    result.write_text("{}")
+    assert lease.complete(str(result))
+    assert sorted(os.listdir(tmp_path)) == ["batch1.result", "batch1.target.done"]
+
+
+def test_expired_lease_is_reclaimed_and_late_result_discarded(tmp_path):
+    add_target(tmp_path)
+    first = Spool(str(tmp_path), lease_time=-1, worker_id="w1").lease()
+    second = Spool(str(tmp_path), lease_time=60, worker_id="w2").lease()
+    assert second is not None and not first.is_held()
+
+    result = tmp_path / "late.tmp"
+    result.write_text("{}")
+    assert not first.complete(str(result))
+    assert not result.exists()
+    assert not (tmp_path / "batch1.result").exists()
+    assert second.is_held()
+
+
+def test_oldest_target_is_leased_first(tmp_path):
+    add_target(tmp_path, "new")
+    add_target(tmp_path, "old")
+    os.utime(tmp_path / "old.target", (0, 0))
+    assert Spool(str(tmp_path), worker_id="w1").lease().name == "old.target"
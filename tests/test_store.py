@@ -0,0 +1,86 @@
+import json
+import sqlite3
+
+from contextlib import closing
+
+import pytest
+
+from helpers.store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.record_scan("https://www.example.com", "192.0.2.1", "full", 1000.0, 60.04, [
+        {"id": "scanTime", "finding": "60"},
+        {"id": "TLS1", "severity": "LOW", "finding": "offered (deprecated)"},
+        {"id": "heartbleed", "severity": "OK", "finding": "not vulnerable", "cve": "CVE-2014-0160", "cwe": "CWE-119"},
+    ])
+    store.record_scan("https://mail.example.com:8443", "192.0.2.2", "quick", 2000.0, 5, [
+        {"id": "TLS1", "severity": "OK", "finding": "not offered"},
+        {"id": "cert_trust", "severity": "CRITICAL", "finding": "certificate does not match supplied URI"},
+    ])
+    store.record_scan("https://example.org", None, "full", 3000.0, 30, [
+        {"id": "TLS1", "severity": "LOW", "finding": "offered (deprecated)"},
+    ], incomplete_sections={"vulnerabilities", "headers"})
+    return store
+
+
+def scans(store: ResultStore) -> list:
+    with closing(sqlite3.connect(store.path)) as connection:
+        return connection.execute("SELECT target, host, port, ip, profile, time, duration, incomplete FROM scans ORDER BY id").fetchall()
+
+
+def test_record_scan_stores_scan_and_findings(store):
+    assert scans(store) == [
+        ("https://www.example.com", "www.example.com", 443, "192.0.2.1", "full", 1000.0, 60.0, None),
+        ("https://mail.example.com:8443", "mail.example.com", 8443, "192.0.2.2", "quick", 2000.0, 5.0, None),
+        ("https://example.org", "example.org", 443, None, "full", 3000.0, 30.0, json.dumps(["headers", "vulnerabilities"])),
+    ]
+    assert store.query(finding_id="heartbleed") == [{
+        "time": 1000.0, "target": "https://www.example.com", "host": "www.example.com", "port": 443, "ip": "192.0.2.1",
+        "id": "heartbleed", "severity": "OK", "finding": "not vulnerable", "cve": "CVE-2014-0160", "cwe": "CWE-119",
+    }]
+
+
+def test_record_scan_returns_scan_id_and_keeps_last_repeated_finding(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    first = store.record_scan("https://a.example", None, "full", 1.0, 1, [])
+    second = store.record_scan("https://a.example", None, "full", 2.0, 1, [
+        {"id": "TLS1", "finding": "offered"},
+        {"id": "TLS1", "finding": "not offered"},
+        {"finding": "no id"},
+    ])
+    assert second == first + 1
+    assert [row["finding"] for row in store.query()] == ["not offered"]
+
+
+def test_query_newest_first(store):
+    rows = store.query(finding_id="TLS1")
+    assert [(row["host"], row["severity"]) for row in rows] == [
+        ("example.org", "LOW"), ("mail.example.com", "OK"), ("www.example.com", "LOW"),
+    ]
+
+
+@pytest.mark.parametrize("conditions, expected", [
+    ({"host": "*.example.com"}, {("www.example.com", "TLS1"), ("www.example.com", "heartbleed"), ("www.example.com", "scanTime"),
+                                 ("mail.example.com", "TLS1"), ("mail.example.com", "cert_trust")}),
+    ({"host": "example.org"}, {("example.org", "TLS1")}),
+    ({"finding_id": "cert_*"}, {("mail.example.com", "cert_trust")}),
+    ({"severity": ["critical", "Low"]}, {("www.example.com", "TLS1"), ("mail.example.com", "cert_trust"), ("example.org", "TLS1")}),
+    ({"finding": "offered*"}, {("www.example.com", "TLS1"), ("example.org", "TLS1")}),
+    ({"since": 2000.0}, {("mail.example.com", "TLS1"), ("mail.example.com", "cert_trust"), ("example.org", "TLS1")}),
+    ({"until": 1999.0}, {("www.example.com", "TLS1"), ("www.example.com", "heartbleed"), ("www.example.com", "scanTime")}),
+    ({"host": "*.example.com", "severity": ["LOW"], "since": 500.0, "until": 2500.0}, {("www.example.com", "TLS1")}),
+])
+def test_query_filters(store, conditions, expected):
+    assert {(row["host"], row["id"]) for row in store.query(**conditions)} == expected
+
+
+def test_query_limit(store):
+    rows = store.query(limit=2)
+    assert [row["time"] for row in rows] == [3000.0, 2000.0]
+
+
+def test_query_of_empty_store(tmp_path):
+    assert ResultStore(str(tmp_path / "results.db")).query(host="*") == []
@@ -0,0 +1,119 @@
+import ast
+import os
+import re
+
+import pytest
+
+from helpers.testssl import (SECTION_ORDER, SectionTracker, build_testssl_flags, filter_sections, get_section_of_id,
+                             merge_results, split_sections)
+from helpers.slots import HostSlots
+from helpers.testssl import TestsslJsonReader as JsonReader  # not collected as a test class
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ptssl", "modules")
+
+
+def test_build_testssl_flags_in_scan_order():
+    assert build_testssl_flags(["vulnerabilities", "protocols", "protocols"]) == ["-p", "-U"]
+    assert build_testssl_flags([]) == []
+
+
+def test_build_testssl_flags_rejects_unknown_section():
+    with pytest.raises(ValueError, match="bogus"):
+        build_testssl_flags(["protocols", "bogus"])
+
+
+@pytest.mark.parametrize("item_id, section", [
+    ("TLS1_2", "protocols"),
+    ("cipherlist_3DES_IDEA", "cipher_categories"),
+    ("FS_ECDHE_curves", "fs"),
+    ("cert_notAfter", "server_defaults"),
+    ("HSTS_time", "headers"),
+    ("BEAST_CBC_TLS1", "vulnerabilities"),
+    ("scanTime", None),
+])
+def test_get_section_of_id(item_id, section):
+    assert get_section_of_id(item_id) == section
+
+
+def test_modules_declare_known_sections():
+    for name in os.listdir(MODULES_DIR):
+        if not name.endswith(".py") or name.startswith("_"):
+            continue
+        with open(os.path.join(MODULES_DIR, name)) as f:
+            declared = re.search(r"^__TESTSSL_SECTIONS__ = (.*)$", f.read(), re.MULTILINE)
+        assert declared and set(ast.literal_eval(declared.group(1))) <= set(SECTION_ORDER), name
+
+
+
+def test_json_reader_parses_findings_as_they_are_written(tmp_path):
+    path = tmp_path / "scan.json"
+    reader = JsonReader(str(path))
+    assert reader.read() == []
+
+    data = '[\n  {"id": "SSLv2", "finding": "not offered"},\n  {"id": "SSLv3", "finding": "n\u00e9"'.encode("utf-8")
+    split = data.index(b"\xc3") + 1  # a multi byte character split across writes
+    path.write_bytes(data[:split])
+    assert reader.read() == [{"id": "SSLv2", "finding": "not offered"}]
+    with open(path, "ab") as f:
+        f.write(data[split:] + b"},\n  {\"id\": \"TLS1\"}\n]\n")
+    assert reader.read() == [{"id": "SSLv3", "finding": "n\u00e9"}, {"id": "TLS1"}]
+    assert [item["id"] for item in reader.items] == ["SSLv2", "SSLv3", "TLS1"]
+
+
+def test_section_completes_when_next_section_starts():
+    tracker = SectionTracker()
+    assert tracker.feed([{"id": "engine_problem"}, {"id": "SSLv2"}, {"id": "SSLv3"}]) == set()
+    assert tracker.feed([{"id": "FS"}]) == {"protocols"}
+    assert tracker.started == ["protocols", "fs"]
+
+
+def test_section_completes_on_its_last_id():
+    tracker = SectionTracker()
+    assert tracker.feed([{"id": "TLS1_2"}, {"id": "TLS1_3"}]) == {"protocols"}
+    assert tracker.feed([{"id": "cipherlist_NULL"}]) == set()
+    assert tracker.completed == {"protocols"}
+
+
+def test_finish_completes_remaining_sections():
+    tracker = SectionTracker()
+    tracker.feed([{"id": "TLS1_3"}, {"id": "heartbleed"}])
+    assert tracker.finish() == set(SECTION_ORDER) - {"protocols"}
+    assert tracker.finish() == set()
+
+
+def test_split_sections_in_group_order():
+    groups = split_sections(["headers", "protocols", "vulnerabilities", "cipher_categories", "fs"])
+    assert groups == [["protocols", "fs"], ["cipher_categories"], ["vulnerabilities"], ["headers"]]
+
+
+def test_split_sections_merges_last_groups():
+    groups = split_sections(["headers", "protocols", "vulnerabilities", "cipher_categories"], max_groups=2)
+    assert groups == [["protocols"], ["cipher_categories", "headers", "vulnerabilities"]]
+    assert split_sections(["headers", "protocols"], max_groups=0) == [["protocols"], ["headers"]]
+
+
+def test_split_sections_fit_the_slots_of_a_run(tmp_path):
+    slots = HostSlots(str(tmp_path), 0)
+    assert split_sections(SECTION_ORDER, max_groups=slots.slots) == [list(SECTION_ORDER)]
+
+
+def test_merge_results_keeps_order_and_drops_repeated_findings():
+    metadata = {"id": "scanTime", "finding": "10"}
+    first = [metadata, {"id": "SSLv2", "finding": "not offered"}]
+    second = [dict(metadata), {"id": "cipherlist_NULL", "finding": "not offered"}]
+    assert merge_results([first, second]) == [metadata, first[1], second[1]]
+
+
+def test_filter_sections_keeps_metadata_and_requested_sections():
+    items = [
+        {"id": "scanTime"},
+        {"id": "SSLv2"},
+        {"id": "TLS1_3"},
+        {"id": "cipherlist_NULL"},
+        {"id": "cipher-tls1_2_x9d"},  # unrecognized id, belongs to the preceding section
+        {"id": "heartbleed"},
+    ]
+    assert filter_sections(items, ["cipher_categories", "vulnerabilities"]) == [
+        {"id": "scanTime"}, {"id": "cipherlist_NULL"}, {"id": "cipher-tls1_2_x9d"}, {"id": "heartbleed"},
+    ]
+    assert filter_sections(items, []) == [{"id": "scanTime"}]